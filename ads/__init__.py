@@ -7,6 +7,10 @@ __version__ = "0.12.7"
 
 from .metrics import MetricsQuery
 from .export import ExportQuery
-from .search import SearchQuery, query
+from .search import SearchQuery, ShardedSearchQuery, AdaptiveRows, query
+from .bigquery import BigQuery, resolve_bibcodes
+from .planner import ChunkedSearchQuery, plan_query
+from .identifiers import resolve_identifiers
 from .base import RateLimits
+from .checkpoint import FileCheckpoint, SQLiteCheckpoint
 #from .libraries import LibraryQuery, Library #soon
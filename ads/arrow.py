@@ -0,0 +1,97 @@
+"""
+Apache Arrow record batches built directly from solr docs
+"""
+
+import json
+
+import six
+
+from . import schema as types
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow is an optional dependency
+    pa = None
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Arrow export requires pyarrow: pip install pyarrow")
+
+
+def _arrow_type(field_type):
+    """
+    The Arrow type of a schema.FieldType, or None if it has to be inferred
+    from the values
+    """
+    return {
+        types.INT: pa.int64(),
+        types.FLOAT: pa.float64(),
+        types.DATE: pa.date32(),
+        types.DATETIME: pa.timestamp("ms"),
+        types.LIST: pa.list_(pa.string()),
+    }.get(field_type)
+
+
+def arrow_schema(fields):
+    """
+    The Arrow schema of the fields of a query, from their types in
+    ads.schema. Fields without a type there are strings.
+    :param fields: the "fl" of the query
+    :type fields: list
+    """
+    _require_pyarrow()
+    return pa.schema([
+        (field, _arrow_type(types.field_type(field)) or pa.string())
+        for field in fields
+    ])
+
+
+def _array(field, values, arrow_type=None):
+    """
+    Convert the raw values of `field` into an Arrow array. Missing values
+    become nulls.
+    :param arrow_type: the type the array will be cast to, if known
+    """
+    field_type = types.field_type(field)
+    if field_type is types.RAW and arrow_type == pa.string():
+        # values that are not strings, e.g. nested ones, are kept as JSON
+        return pa.array([
+            v if v is None or isinstance(v, six.string_types)
+            else json.dumps(v) for v in values
+        ], type=pa.string())
+    if field_type is types.RAW:
+        array = pa.array(values)
+        # a page where the field is always missing
+        return array.cast(pa.string()) if array.type == pa.null() else array
+    if field_type is types.LIST:
+        return pa.array(
+            [v if v is None or isinstance(v, list) else [v] for v in values],
+            type=_arrow_type(field_type)
+        )
+    return pa.array(field_type.column(values), from_pandas=True) \
+        .cast(_arrow_type(field_type))
+
+
+def record_batch(docs, fields, schema=None):
+    """
+    Build an Arrow record batch from solr docs, without building Article
+    objects. Requires pyarrow.
+    :param docs: solr docs, e.g. SolrResponse.docs
+    :type docs: list of dict
+    :param fields: the fields, i.e. columns, of the batch
+    :type fields: list
+    :param schema: an Arrow schema to cast the columns to, e.g.
+        arrow_schema(fields); by default the types in ads.schema are used
+        and other fields are inferred from their values
+    :type schema: pyarrow.Schema
+    """
+    _require_pyarrow()
+    if schema is None:
+        arrays = [_array(field, [doc.get(field) for doc in docs])
+                  for field in fields]
+    else:
+        arrays = [_array(field, [doc.get(field) for doc in docs],
+                         schema.field(field).type)
+                  .cast(schema.field(field).type) for field in fields]
+    return pa.RecordBatch.from_arrays(arrays, names=list(fields))
@@ -70,12 +70,71 @@ class RateLimits(Singleton):
         )
 
 
+# Optional fast JSON decoders, in order of preference
+_JSON_DECODERS = ["orjson", "simdjson", "ujson"]
+_json_decoder_cache = {}
+
+
+def get_json_decoder(choice=None):
+    """
+    Return the function used to decode JSON response bodies
+    :param choice: a decoder name, a callable, or None for the fastest
+        installed decoder; defaults to ads.config.json_decoder
+    """
+    if choice is None:
+        choice = ads.config.json_decoder
+    if callable(choice):
+        return choice
+    if choice not in _json_decoder_cache:
+        _json_decoder_cache[choice] = _import_json_decoder(choice)
+    return _json_decoder_cache[choice]
+
+
+def _import_json_decoder(choice):
+    """
+    Import the `loads` function of the decoder named `choice`
+    """
+    if choice in (None, "json"):
+        names = [] if choice == "json" else _JSON_DECODERS
+    else:
+        names = [choice]
+    for name in names:
+        try:
+            module = __import__(name)
+        except ImportError:
+            if choice is not None:
+                raise
+            continue
+        return module.loads
+    return json.loads
+
+
 class APIResponse(object):
     """
     Represents an adsws-api http response
     """
     response = None
 
+    @staticmethod
+    def _decode_json(http_response):
+        """
+        Decode the JSON body of `http_response` with the configured decoder.
+        The fast decoders are given the raw bytes; the stdlib decoder is
+        given the text, as it only takes bytes from python 3.6 on.
+        """
+        decoder = get_json_decoder()
+        body = getattr(http_response, "content", None)
+        if body is None or decoder is json.loads:
+            body = http_response.text
+        return decoder(body)
+
+    @staticmethod
+    def _raw_text(http_response):
+        """
+        The raw text of `http_response` if ads.config.keep_raw is set
+        """
+        return http_response.text if ads.config.keep_raw else None
+
     @classmethod
     def get_ratelimits(cls):
         """
@@ -93,6 +152,10 @@ class APIResponse(object):
         if not http_response.ok:
             raise APIResponseError(http_response.text)
         c = cls(http_response)
+        if not ads.config.keep_raw:
+            # requests holds on to the body as well; the response has been
+            # parsed, so release it
+            http_response._content = None
         c.response = http_response
 
         RateLimits.getRateLimits(cls.__name__).set(c.response.headers)
@@ -0,0 +1,320 @@
+"""
+Bulk retrieval of records for a known list of bibcodes with the adsws
+bigquery service
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import six
+
+from .config import BIGQUERY_URL
+from .search import SearchQuery, MAX_URL_LENGTH
+
+
+class _BigQueryChunk(SearchQuery):
+    """
+    A SearchQuery restricted to one chunk of bibcodes, which are POSTed
+    along with every page request
+    """
+    HTTP_ENDPOINT = BIGQUERY_URL
+
+    def __init__(self, bibcodes, *args, **kwargs):
+        """
+        :param bibcodes: the bibcodes of this chunk
+        :type bibcodes: list
+        """
+        super(_BigQueryChunk, self).__init__(*args, **kwargs)
+        self.bibcodes = bibcodes
+        self._payload = "bibcode\n" + "\n".join(bibcodes)
+
+    def _request(self, query, streaming=False):
+        return self.session.post(
+            self.HTTP_ENDPOINT, params=query, data=self._payload,
+            headers={"Content-Type": "big-query/csv"}, stream=streaming
+        )
+
+
+class BigQuery(SearchQuery):
+    """
+    Retrieves the records of a list of bibcodes. The list is sent to the
+    bigquery service in chunks of at most MAX_BIBCODES, and every chunk is
+    paginated in turn; "q" and "fq" further filter the records.
+    """
+    HTTP_ENDPOINT = BIGQUERY_URL
+    MAX_BIBCODES = 2000  # per request limit of the bigquery service
+
+    def __init__(self, bibcodes, q="*:*", rows=MAX_BIBCODES,
+                 chunk_size=MAX_BIBCODES, **kwargs):
+        """
+        :param bibcodes: the bibcodes to retrieve; repeated bibcodes are
+            only retrieved once
+        :type bibcodes: list or string
+        :param q: solr "q" param, applied to the bibcodes' records
+        :param rows: solr "rows" param
+        :param chunk_size: number of bibcodes sent per request
+        :param kwargs: kwargs passed on to SearchQuery, e.g. fl, sort or
+            prefetch. Every chunk is paginated until it is exhausted, so
+            max_pages does not apply.
+        """
+        super(BigQuery, self).__init__(q=q, rows=rows, **kwargs)
+        assert 0 < chunk_size <= self.MAX_BIBCODES, \
+            "chunk_size must be between 1 and {}".format(self.MAX_BIBCODES)
+        if isinstance(bibcodes, six.string_types):
+            bibcodes = [bibcodes]
+        self.bibcodes = list(OrderedDict.fromkeys(bibcodes))
+        self.chunk_size = chunk_size
+        self._n_chunks = 0  # Number of chunks started so far
+        self._chunk = None  # query of the current chunk
+
+    @property
+    def progress(self):
+        """
+        Returns the number of records retrieved so far over the number of
+        bibcodes, e.g. "1234/5000"
+        """
+        if self._n_chunks == 0:
+            return "Query has not been executed"
+        return "{}/{}".format(self._n_fetched, len(self.bibcodes))
+
+    def __next__(self):
+        while True:
+            chunk = self._current_chunk()
+            if chunk is None:
+                raise StopIteration("All records found")
+            try:
+                article = next(chunk)
+            except StopIteration:
+                self._finish_chunk()
+                continue
+            self._n_fetched += 1
+            if not self.stream:
+                self._articles.append(article)
+            return article
+
+    def execute(self):
+        """
+        Retrieve the records of every remaining bibcode into .articles
+        """
+        for _ in self:
+            pass
+
+    def iter_pages(self):
+        """
+        Yield the SolrResponse of each remaining page of every chunk,
+        without building Article objects; see SearchQuery.iter_pages
+        """
+        chunk = self._current_chunk()
+        while chunk is not None:
+            for response in chunk.iter_pages():
+                self.response = response
+                self._n_fetched += response.n_docs
+                yield response
+            self._finish_chunk()
+            chunk = self._current_chunk()
+
+    def iter_docs(self):
+        """
+        Yield the solr docs of every remaining chunk one at a time as they
+        are parsed; see SearchQuery.iter_docs
+        """
+        chunk = self._current_chunk()
+        while chunk is not None:
+            for doc in chunk.iter_docs():
+                self._n_fetched += 1
+                yield doc
+            self.response = chunk.response
+            self._finish_chunk()
+            chunk = self._current_chunk()
+
+    def close(self):
+        if self._chunk is not None:
+            self._chunk.close()
+
+    def count(self):
+        """
+        Return the number of records of the bibcodes that match the query,
+        with one request per chunk that does not return any documents
+        """
+        return sum(chunk.count() for chunk in self._chunk_queries())
+
+    def count_many(self, queries, max_url_length=MAX_URL_LENGTH):
+        """
+        Count the records of the bibcodes matching each of `queries`, summed
+        over the chunks; see SearchQuery.count_many
+        """
+        counts = [0] * len(queries)
+        for chunk in self._chunk_queries():
+            counts = [total + n for total, n in zip(
+                counts, chunk.count_many(queries, max_url_length))]
+        return counts
+
+    def execute_parallel(self, max_workers=4):
+        raise TypeError(
+            "BigQuery pages through its chunks one after the other; use "
+            "resolve_bibcodes() to fetch chunks concurrently")
+
+    @property
+    def facets(self):
+        """
+        The FacetResult of the query, from a request for the bibcodes that
+        does not return any documents. Facets can't be merged across
+        chunks, so there must be at most chunk_size bibcodes.
+        """
+        return self._single_chunk().facets
+
+    @property
+    def stats(self):
+        """
+        The StatsResult of the query, from a request for the bibcodes that
+        does not return any documents. Stats can't be merged across chunks,
+        so there must be at most chunk_size bibcodes.
+        """
+        return self._single_chunk().stats
+
+    def _single_chunk(self):
+        if len(self.bibcodes) > self.chunk_size:
+            raise ValueError(
+                "facets and stats are only supported for up to chunk_size "
+                "({}) bibcodes".format(self.chunk_size))
+        chunk = self._chunk_query(self.bibcodes, dict(self._query, rows=0))
+        chunk.execute()
+        return chunk.response
+
+    def _chunk_queries(self):
+        """
+        Yield a fresh query for each chunk of the bibcodes, from the first
+        """
+        for start in range(0, len(self.bibcodes), self.chunk_size):
+            yield self._chunk_query(
+                self.bibcodes[start:start + self.chunk_size], self._query)
+
+    def _chunk_query(self, bibcodes, query_dict):
+        """
+        The query for a chunk of bibcodes, sharing this query's settings
+        """
+        # a chunk has at most one record per bibcode, and pagination stops
+        # at numFound, so this never cuts a chunk short
+        chunk = _BigQueryChunk(
+            bibcodes, query_dict=dict(query_dict), max_pages=len(bibcodes),
+            prefetch=self.prefetch, stream=self.stream,
+            adaptive_rows=self.adaptive_rows
+        )
+        chunk._token = self._token
+        chunk._interner = self._interner
+        return chunk
+
+    def _current_chunk(self):
+        """
+        The query of the chunk being retrieved, starting the next chunk if
+        there is none; None once every chunk is done
+        """
+        if self._chunk is None:
+            start = self._n_chunks * self.chunk_size
+            bibcodes = self.bibcodes[start:start + self.chunk_size]
+            if not bibcodes:
+                return None
+            self._chunk = self._chunk_query(bibcodes, self._query)
+            self._n_chunks += 1
+        return self._chunk
+
+    def _finish_chunk(self):
+        """
+        Move on from the current chunk
+        """
+        self._chunk.close()
+        self._highlights.update(self._chunk._highlights)
+        if self._chunk.response is not None:
+            self.response = self._chunk.response
+        self._chunk = None
+
+
+class ResolvedBibcodes(object):
+    """
+    The records of a list of bibcodes, in the order of the list
+    """
+
+    def __init__(self, bibcodes, found):
+        """
+        :param bibcodes: the bibcodes that were resolved, in input order
+        :type bibcodes: list
+        :param found: bibcode (or alternate bibcode) to Article
+        :type found: dict
+        """
+        self.bibcodes = bibcodes
+        self.found = found
+
+    @property
+    def articles(self):
+        """
+        One Article per input bibcode, or None if it was not found. Repeated
+        bibcodes, and bibcodes that are alternates of one another, share an
+        Article.
+        """
+        return [self.found.get(bibcode) for bibcode in self.bibcodes]
+
+    @property
+    def missing(self):
+        """
+        The input bibcodes that have no record, without repeats
+        """
+        return [bibcode for bibcode in OrderedDict.fromkeys(self.bibcodes)
+                if bibcode not in self.found]
+
+    def __getitem__(self, i):
+        return self.found.get(self.bibcodes[i])
+
+    def __len__(self):
+        return len(self.bibcodes)
+
+    def __iter__(self):
+        return iter(self.articles)
+
+    def __repr__(self):
+        return "<ResolvedBibcodes {} bibcodes, {} missing>".format(
+            len(self.bibcodes), len(self.missing))
+
+
+def resolve_bibcodes(bibcodes, fl=SearchQuery.DEFAULT_FIELDS,
+                     chunk_size=BigQuery.MAX_BIBCODES, max_workers=4,
+                     token=None):
+    """
+    Retrieve the records of `bibcodes` with the bigquery service, running
+    the chunks of the list concurrently, and match them back to the list.
+    A bibcode is also matched by the records that list it as one of their
+    alternate_bibcode.
+    :param bibcodes: the bibcodes to resolve; may contain repeats
+    :type bibcodes: list
+    :param fl: fields to retrieve; bibcode and alternate_bibcode are always
+        retrieved
+    :param chunk_size: number of bibcodes per request
+    :param max_workers: maximum number of concurrent requests
+    :param token: optional API token to use for the requests
+    :rtype: ResolvedBibcodes
+    """
+    assert max_workers > 0, "max_workers must be greater than 0"
+    if isinstance(bibcodes, six.string_types):
+        bibcodes = [bibcodes]
+    bibcodes = list(bibcodes)
+    fl = [f for f in fl if f not in ("bibcode", "alternate_bibcode")]
+    fl += ["bibcode", "alternate_bibcode"]
+
+    unique = list(OrderedDict.fromkeys(bibcodes))
+    chunks = [unique[i:i + chunk_size]
+              for i in range(0, len(unique), chunk_size)]
+
+    def fetch(chunk):
+        return list(BigQuery(chunk, fl=fl, rows=len(chunk),
+                             chunk_size=len(chunk), token=token))
+
+    found = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for articles in executor.map(fetch, chunks):
+            for article in articles:
+                for alternate in article._raw.get("alternate_bibcode") or []:
+                    found.setdefault(alternate, article)
+            for article in articles:
+                # a bibcode's own record wins over one that lists it as an
+                # alternate
+                found[article._raw["bibcode"]] = article
+    return ResolvedBibcodes(bibcodes, found)
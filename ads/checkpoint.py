@@ -0,0 +1,120 @@
+"""
+Checkpoints that record the progress of a SearchQuery so that a long
+harvest can be resumed with SearchQuery.resume()
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+
+
+class Checkpoint(object):
+    """
+    Base class for storing the state of a SearchQuery
+    """
+
+    def save(self, state):
+        """
+        Store `state`, replacing any previously saved state
+        :param state: json serializable query state
+        :type state: dict
+        """
+        raise NotImplementedError
+
+    def load(self):
+        """
+        Return the most recently saved state, or None if there is none
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        """
+        Remove any saved state
+        """
+        raise NotImplementedError
+
+
+class FileCheckpoint(Checkpoint):
+    """
+    Stores the query state as a json file. The file is replaced atomically
+    so that a crash while saving leaves the previous state intact.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: path of the json file
+        """
+        self.path = os.path.abspath(os.path.expanduser(path))
+
+    def save(self, state):
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(self.path),
+            prefix=".{}.".format(os.path.basename(self.path))
+        )
+        try:
+            with os.fdopen(fd, "w") as fp:
+                json.dump(state, fp)
+            getattr(os, "replace", os.rename)(tmp_path, self.path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+    def load(self):
+        try:
+            with open(self.path) as fp:
+                return json.load(fp)
+        except IOError:
+            return None
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class SQLiteCheckpoint(Checkpoint):
+    """
+    Stores the query state in a SQLite database, keyed by `name` so that
+    several harvests can share one database
+    """
+
+    def __init__(self, path, name="default"):
+        """
+        :param path: path of the SQLite database
+        :param name: name of this harvest within the database
+        """
+        self.path = os.path.expanduser(path)
+        self.name = name
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints "
+                "(name TEXT PRIMARY KEY, state TEXT NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def save(self, state):
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO checkpoints (name, state) VALUES (?, ?)",
+                (self.name, json.dumps(state))
+            )
+
+    def load(self):
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT state FROM checkpoints WHERE name = ?", (self.name,)
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def clear(self):
+        with self._connect() as db:
+            db.execute("DELETE FROM checkpoints WHERE name = ?", (self.name,))
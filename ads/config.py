@@ -19,3 +19,12 @@ TOKEN_FILES = list(map(os.path.expanduser,
 ))
 TOKEN_ENVIRON_VARS = ["ADS_API_TOKEN", "ADS_DEV_KEY"]
 token = None  # for setting in-situ
+
+# Response parsing
+# JSON decoder for API responses: "orjson", "simdjson", "ujson", "json", or a
+# callable taking the response body as bytes. None uses the fastest one
+# installed.
+json_decoder = None
+# Keep the raw text of each response (as ._raw) after it has been parsed.
+# Set to False to halve the memory held by large responses.
+keep_raw = True
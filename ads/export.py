@@ -15,8 +15,8 @@ class ExportResponse(APIResponse):
     Data structure that represents a response from the ads export service
     """
     def __init__(self, http_response):
-        self._raw = http_response.text
-        self.result = http_response.json()['export']
+        self._raw = self._raw_text(http_response)
+        self.result = self._decode_json(http_response)['export']
 
     def __str__(self):
         if six.PY3:
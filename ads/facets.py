@@ -0,0 +1,136 @@
+"""
+Typed representations of the solr facet component
+"""
+
+import six
+
+
+def _pairs(flat):
+    """
+    Turn solr's flat [value, count, value, count, ...] lists into a list of
+    (value, count) tuples
+    """
+    return list(zip(flat[::2], flat[1::2]))
+
+
+class RangeFacet(object):
+    """
+    Counts for a single facet.range field
+    """
+
+    def __init__(self, field, data):
+        """
+        :param field: the field that was faceted on
+        :param data: the field's entry in facet_counts.facet_ranges
+        :type data: dict
+        """
+        self.field = field
+        self.counts = _pairs(data.get("counts", []))
+        self.start = data.get("start")
+        self.end = data.get("end")
+        self.gap = data.get("gap")
+        self.before = data.get("before")
+        self.after = data.get("after")
+        self.between = data.get("between")
+
+    def __repr__(self):
+        return "<RangeFacet {} [{} TO {}] by {}>".format(
+            self.field, self.start, self.end, self.gap)
+
+
+class PivotFacet(object):
+    """
+    A single value of a facet.pivot, with the pivots nested below it
+    """
+
+    def __init__(self, data):
+        """
+        :param data: an entry of a facet_counts.facet_pivot list
+        :type data: dict
+        """
+        self.field = data.get("field")
+        self.value = data.get("value")
+        self.count = data.get("count")
+        self.pivot = [PivotFacet(p) for p in data.get("pivot", [])]
+
+    def __repr__(self):
+        return "<PivotFacet {}:{} ({})>".format(
+            self.field, self.value, self.count)
+
+
+class FacetResult(object):
+    """
+    The facet counts of a solr response
+    """
+
+    def __init__(self, facet_counts):
+        """
+        :param facet_counts: the "facet_counts" section of a solr response
+        :type facet_counts: dict
+        """
+        self._raw = facet_counts
+        self.queries = dict(facet_counts.get("facet_queries", {}))
+        self.fields = dict(
+            (field, _pairs(counts)) for field, counts in
+            six.iteritems(facet_counts.get("facet_fields", {}))
+        )
+        self.ranges = dict(
+            (field, RangeFacet(field, data)) for field, data in
+            six.iteritems(facet_counts.get("facet_ranges", {}))
+        )
+        self.pivots = dict(
+            (fields, [PivotFacet(p) for p in pivots]) for fields, pivots in
+            six.iteritems(facet_counts.get("facet_pivot", {}))
+        )
+
+    def __repr__(self):
+        return "<FacetResult fields={} ranges={} pivots={} queries={}>".format(
+            sorted(self.fields), sorted(self.ranges), sorted(self.pivots),
+            len(self.queries))
+
+
+def facet_params(field=None, range=None, pivot=None, limit=None,
+                 mincount=None):
+    """
+    Build the solr params for the facet component
+    :param field: field, or list of fields, for facet.field
+    :param range: dict, or list of dicts, with the keys "field", "start",
+        "end" and "gap" (and optionally "other") for facet.range
+    :param pivot: comma separated fields, or a list of fields, or a list of
+        either of those, for facet.pivot
+    :param limit: facet.limit
+    :param mincount: facet.mincount
+    :return: dict of params, empty if no facets were requested
+    """
+    params = {}
+    if field is not None:
+        params["facet.field"] = \
+            [field] if isinstance(field, six.string_types) else list(field)
+    if range is not None:
+        ranges = [range] if isinstance(range, dict) else list(range)
+        params["facet.range"] = []
+        for r in ranges:
+            params["facet.range"].append(r["field"])
+            for key in ("start", "end", "gap", "other"):
+                if r.get(key) is not None:
+                    params["f.{}.facet.range.{}".format(r["field"], key)] = \
+                        r[key]
+    if pivot is not None:
+        if isinstance(pivot, six.string_types):
+            pivot = [pivot]
+        elif all(isinstance(p, six.string_types) and "," not in p
+                 for p in pivot):
+            # a single pivot given as a list of fields
+            pivot = [pivot]
+        params["facet.pivot"] = [
+            p if isinstance(p, six.string_types) else ",".join(p)
+            for p in pivot
+        ]
+    if not params:
+        return params
+    params["facet"] = "true"
+    if limit is not None:
+        params["facet.limit"] = limit
+    if mincount is not None:
+        params["facet.mincount"] = mincount
+    return params
@@ -0,0 +1,211 @@
+"""
+Bulk resolution of DOIs, arXiv ids and alternate bibcodes to bibcodes
+"""
+
+import os
+import re
+import sqlite3
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import six
+
+from .search import SearchQuery
+
+
+# Fields of a record whose values identify it
+IDENTIFIER_FIELDS = ["bibcode", "identifier", "doi", "alternate_bibcode"]
+
+_DOI_PREFIX = re.compile(r"^(https?://(dx\.)?doi\.org/|doi:)", re.I)
+_ARXIV_PREFIX = re.compile(r"^(https?://arxiv\.org/abs/|arxiv:)", re.I)
+_ARXIV_ID = re.compile(r"^(\d{4}\.\d{4,5}|[a-z\-]+(\.[A-Z]{2})?/\d{7})(v\d+)?$",
+                       re.I)
+
+
+def normalize_identifier(identifier):
+    """
+    Return the form of `identifier` that ADS indexes: DOIs without a
+    "doi:" or resolver prefix, and arXiv ids as "arXiv:<id>" without a
+    version. Anything else, e.g. a bibcode, is returned as is.
+    """
+    identifier = identifier.strip()
+    if _DOI_PREFIX.match(identifier):
+        return _DOI_PREFIX.sub("", identifier)
+    arxiv_id = _ARXIV_PREFIX.sub("", identifier)
+    match = _ARXIV_ID.match(arxiv_id)
+    if match:
+        return "arXiv:{}".format(match.group(1))
+    return identifier
+
+
+def _key(identifier):
+    """
+    The key of a normalized identifier in memos: DOIs and arXiv ids are
+    case insensitive, bibcodes are not
+    """
+    return identifier.lower() if identifier.startswith(("10.", "arXiv:")) \
+        else identifier
+
+
+class IdentifierMemo(object):
+    """
+    Remembers the bibcode that each identifier, by its normalized and case
+    folded key, resolved to, or None if it did not resolve. Kept in memory;
+    see SQLiteIdentifierMemo for a memo that persists.
+    """
+
+    def __init__(self):
+        self._memo = {}
+
+    def get_many(self, identifiers):
+        """
+        Return the remembered identifiers of `identifiers`, mapped to their
+        bibcode (or None)
+        :type identifiers: list
+        :rtype: dict
+        """
+        return dict((i, self._memo[i]) for i in identifiers if i in self._memo)
+
+    def update(self, resolved):
+        """
+        Remember identifiers
+        :param resolved: identifier to bibcode, or None
+        :type resolved: dict
+        """
+        self._memo.update(resolved)
+
+
+class SQLiteIdentifierMemo(IdentifierMemo):
+    """
+    An IdentifierMemo stored in a SQLite database, so that identifiers are
+    only ever resolved once across runs
+    """
+    # SQLite's default limit on the number of parameters of a statement
+    _MAX_PARAMS = 999
+
+    def __init__(self, path):
+        """
+        :param path: path of the SQLite database
+        """
+        self.path = os.path.expanduser(path)
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS identifiers "
+                "(identifier TEXT PRIMARY KEY, bibcode TEXT)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def get_many(self, identifiers):
+        identifiers = list(identifiers)
+        found = {}
+        with self._connect() as db:
+            for i in range(0, len(identifiers), self._MAX_PARAMS):
+                chunk = identifiers[i:i + self._MAX_PARAMS]
+                found.update(db.execute(
+                    "SELECT identifier, bibcode FROM identifiers "
+                    "WHERE identifier IN ({})".format(
+                        ",".join("?" * len(chunk))),
+                    chunk
+                ).fetchall())
+        return found
+
+    def update(self, resolved):
+        with self._connect() as db:
+            db.executemany(
+                "INSERT OR REPLACE INTO identifiers (identifier, bibcode) "
+                "VALUES (?, ?)", list(six.iteritems(resolved))
+            )
+
+
+def _quote(identifier):
+    return u'"{}"'.format(identifier.replace("\\", "\\\\").replace('"', '\\"'))
+
+
+def _resolve_chunk(identifiers, token=None):
+    """
+    Resolve normalized identifiers with one identifier:(...) query, matching
+    each against the identifying fields of the records that come back
+    :return: the key of each identifier that was found, mapped to its
+        bibcode
+    """
+    wanted = set(_key(i) for i in identifiers)
+    sq = SearchQuery(
+        q=u"identifier:({})".format(" OR ".join(_quote(i) for i in identifiers)),
+        fl=IDENTIFIER_FIELDS, rows=min(len(identifiers), 2000), start=0,
+        # an identifier can match more than one record, so page to numFound
+        max_pages=float("inf"), token=token
+    )
+    resolved = {}
+    for response in sq.iter_pages():
+        for doc in response.docs:
+            for field in IDENTIFIER_FIELDS:
+                values = doc.get(field) or []
+                if isinstance(values, six.string_types):
+                    values = [values]
+                for value in values:
+                    key = _key(normalize_identifier(value))
+                    if key in wanted:
+                        # the first, i.e. best scoring, record wins
+                        resolved.setdefault(key, doc["bibcode"])
+    return resolved
+
+
+def resolve_identifiers(identifiers, memo=None, chunk_size=100,
+                        max_workers=4, token=None):
+    """
+    Resolve DOIs, arXiv ids and (alternate) bibcodes to bibcodes, packing
+    many of them into each identifier:(...) query and running the queries
+    concurrently. Identifiers that are already in `memo` are not sent to
+    the API, and every newly resolved identifier, found or not, is added
+    to it.
+    :param identifiers: the identifiers to resolve; may contain repeats
+    :type identifiers: list
+    :param memo: an IdentifierMemo, or the path of a SQLite database to keep
+        a SQLiteIdentifierMemo in; by default nothing is kept across calls
+    :param chunk_size: number of identifiers per query
+    :param max_workers: maximum number of concurrent requests
+    :param token: optional API token to use for the requests
+    :return: each distinct input identifier, in input order, mapped to its
+        bibcode or None if it did not resolve
+    :rtype: OrderedDict
+    """
+    assert chunk_size > 0, "chunk_size must be greater than 0"
+    assert max_workers > 0, "max_workers must be greater than 0"
+    if memo is None:
+        memo = IdentifierMemo()
+    elif isinstance(memo, six.string_types):
+        memo = SQLiteIdentifierMemo(memo)
+    if isinstance(identifiers, six.string_types):
+        identifiers = [identifiers]
+
+    keys = OrderedDict()  # input identifier to memo key
+    normalized = OrderedDict()  # memo key to the identifier to query
+    for identifier in identifiers:
+        normal = normalize_identifier(identifier)
+        keys[identifier] = _key(normal)
+        normalized.setdefault(_key(normal), normal)
+    known = memo.get_many(list(normalized))
+    pending = [normal for key, normal in six.iteritems(normalized)
+               if key not in known]
+    chunks = [pending[i:i + chunk_size]
+              for i in range(0, len(pending), chunk_size)]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for chunk, resolved in zip(chunks, executor.map(
+                lambda chunk: _resolve_chunk(chunk, token=token), chunks)):
+            resolved = dict((_key(i), resolved.get(_key(i))) for i in chunk)
+            memo.update(resolved)
+            known.update(resolved)
+
+    return OrderedDict(
+        (identifier, known[key]) for identifier, key in six.iteritems(keys)
+    )
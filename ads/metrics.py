@@ -4,9 +4,16 @@ interfaces to the adsws metrics service
 
 import json
 import six
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 from .base import APIResponse, BaseQuery
 from .config import METRICS_URL
+import ads.config
+
+# Indicators that are not sums over papers, so that the value for a set of
+# papers cannot be computed from the values for its parts
+_UNMERGEABLE_INDICATORS = ["h", "g", "m", "riq"]
 
 
 class MetricsResponse(APIResponse):
@@ -14,8 +21,22 @@ class MetricsResponse(APIResponse):
     Data structure that represents a response from the ads metrics service
     """
     def __init__(self, http_response):
-        self._raw = http_response.text
-        self.metrics = http_response.json()
+        self._raw = self._raw_text(http_response)
+        self.metrics = self._decode_json(http_response)
+        self.unmerged = []
+
+    @classmethod
+    def _merge(cls, responses):
+        """
+        Build the response for the union of the disjoint sets of bibcodes of
+        `responses`; see merge_metrics()
+        """
+        response = cls.__new__(cls)
+        response.metrics, response.unmerged = merge_metrics(
+            [r.metrics for r in responses])
+        response._raw = json.dumps(response.metrics) \
+            if ads.config.keep_raw else None
+        return response
 
     def __str__(self):
         if six.PY3:
@@ -32,23 +53,124 @@ class MetricsQuery(BaseQuery):
     """
 
     HTTP_ENDPOINT = METRICS_URL
+    MAX_BIBCODES = 2000  # per request limit of the metrics service
 
-    def __init__(self, bibcodes):
+    def __init__(self, bibcodes, chunk_size=MAX_BIBCODES, max_workers=4):
         """
         :param bibcodes: Bibcodes to send to in the metrics query
         :type bibcodes: list or string
+        :param chunk_size: number of bibcodes sent per request. Longer
+            lists are sent in chunks whose metrics are merged; see
+            merge_metrics()
+        :param max_workers: maximum number of concurrent requests
         """
+        assert chunk_size > 0, "chunk_size must be greater than 0"
+        assert max_workers > 0, "max_workers must be greater than 0"
         self.response = None  # current MetricsResponse object
+        self.responses = []  # MetricsResponse of every chunk
         if isinstance(bibcodes, six.string_types):
             bibcodes = [bibcodes]
         self.bibcodes = bibcodes
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
         self.json_payload = json.dumps({"bibcodes": bibcodes})
 
     def execute(self):
         """
-        Execute the http request to the metrics service
+        Execute the http request to the metrics service, or one request per
+        chunk of the bibcodes, run concurrently, if there are more than
+        chunk_size of them
         """
-        self.response = MetricsResponse.load_http_response(
-            self.session.post(self.HTTP_ENDPOINT, data=self.json_payload)
+        if len(self.bibcodes) <= self.chunk_size:
+            self.response = self._post(self.json_payload)
+            self.responses = [self.response]
+            return self.response.metrics
+
+        # a repeated bibcode would be counted once per chunk it is in
+        bibcodes = list(OrderedDict.fromkeys(self.bibcodes))
+        payloads = [json.dumps({"bibcodes": bibcodes[i:i + self.chunk_size]})
+                    for i in range(0, len(bibcodes), self.chunk_size)]
+        # create the session up front rather than racing to in the workers
+        self.session
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            self.responses = list(executor.map(self._post, payloads))
+        self.response = MetricsResponse._merge(self.responses)
+        return self.response.metrics
+
+    def _post(self, payload):
+        return MetricsResponse.load_http_response(
+            self.session.post(self.HTTP_ENDPOINT, data=payload)
         )
-        return self.response.metrics
\ No newline at end of file
+
+
+def _sum(values):
+    """
+    Sum numbers, or dicts of them such as histograms key by key, or
+    concatenate lists, e.g. of skipped bibcodes or self-citations, without
+    repeats
+    """
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    if isinstance(values[0], dict):
+        keys = OrderedDict((k, None) for v in values for k in v)
+        return dict((k, _sum([v.get(k) for v in values])) for k in keys)
+    if isinstance(values[0], list):
+        # a paper can cite, or be skipped in, more than one chunk
+        return list(OrderedDict((x, None) for v in values for x in v))
+    return sum(values)
+
+
+def _mergeable(section, name):
+    if name.startswith("median") or name == "number of citing papers":
+        # citing papers can cite papers of more than one chunk
+        return False
+    if section.startswith(("indicators", "time series")):
+        return name not in _UNMERGEABLE_INDICATORS
+    return True
+
+
+def merge_metrics(chunks):
+    """
+    Merge the metrics of disjoint sets of bibcodes into the metrics of
+    their union. Totals, counts, histograms, time series of counts and the
+    i10, i100, read10 and tori indicators are summed, which is exact.
+    Averages are weighted by the number of papers of each set. Medians,
+    the number of citing papers and the h, g, m and riq indicators cannot
+    be merged: they are set to None. Lists are concatenated without
+    repeats, and sections that are None in every chunk are left out.
+    :param chunks: the metrics of each set, as returned by the service
+    :type chunks: list of dict
+    :return: (the merged metrics, the "<section>/<name>" of every metric
+        that is None because it could not be merged)
+    """
+    merged, unmerged = {}, []
+    sections = OrderedDict((k, None) for chunk in chunks for k in chunk)
+    for section in sections:
+        values = [chunk.get(section) for chunk in chunks]
+        first = next((v for v in values if v is not None), None)
+        if first is None:
+            continue
+        if not isinstance(first, dict) or section == "histograms":
+            merged[section] = _sum(values)
+            continue
+        # the number of papers that the averages of the section are over
+        basic = "basic stats refereed" if section.endswith("refereed") \
+            else "basic stats"
+        papers = [(chunk.get(basic) or {}).get("number of papers", 0)
+                  for chunk in chunks]
+        merged[section] = {}
+        names = OrderedDict((k, None) for v in values if v for k in v)
+        for name in names:
+            column = [(v or {}).get(name) for v in values]
+            if not _mergeable(section, name):
+                merged[section][name] = None
+                unmerged.append("{}/{}".format(section, name))
+            elif name.startswith("average"):
+                total = sum(papers)
+                merged[section][name] = sum(
+                    (a or 0) * n for a, n in zip(column, papers)
+                ) / float(total) if total else 0.0
+            else:
+                merged[section][name] = _sum(column)
+    return merged, unmerged
\ No newline at end of file
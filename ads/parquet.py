@@ -0,0 +1,304 @@
+"""
+Partitioned Parquet datasets written page by page from a SearchQuery
+"""
+
+import os
+import shutil
+import uuid
+from collections import OrderedDict
+
+from six.moves.urllib.parse import quote
+
+from .arrow import pa, arrow_schema, _require_pyarrow
+from .checkpoint import FileCheckpoint
+from .search import SearchQuery
+
+try:
+    import pyarrow.dataset
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is an optional dependency
+    pq = None
+
+
+class _PartitionFile(object):
+    """
+    A file of one partition being written. Rows are buffered until there
+    are row_group_size of them, so that every flush writes one full row
+    group rather than one small row group per page.
+    """
+
+    def __init__(self, staged, final, schema, compression, row_group_size):
+        self.staged = staged
+        self.final = final
+        self.schema = schema
+        self.compression = compression
+        self.row_group_size = row_group_size
+        self._writer = None
+        self._pending = []
+        self.n_pending = 0
+
+    def write(self, table):
+        self._pending.append(table)
+        self.n_pending += table.num_rows
+        if self.n_pending >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the buffered rows as one row group
+        """
+        if not self._pending:
+            return
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.staged, self.schema,
+                                            compression=self.compression)
+        table = pa.concat_tables(self._pending)
+        self._writer.write_table(table, row_group_size=table.num_rows)
+        self._pending = []
+        self.n_pending = 0
+
+    def close(self):
+        """
+        Flush the buffered rows and close the file
+        """
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+
+    def discard(self):
+        """
+        Close the file without writing the buffered rows
+        """
+        self._pending = []
+        self.n_pending = 0
+        if self._writer is not None:
+            self._writer.close()
+
+
+class ParquetDataset(object):
+    """
+    A Parquet dataset on disk, partitioned hive style by one field, e.g.
+    year=2012/part-....parquet, and written one page at a time so that
+    memory use does not grow with the size of the harvest.
+
+    Files are written to a hidden staging directory and only moved into the
+    dataset when they are committed, every `commit_every` pages. The
+    manifest, _ads_dataset.json, lists the committed files along with the
+    query state after the last committed page, including its cursorMark,
+    and is replaced atomically. Files that are not in the manifest are
+    removed before writing, so an interrupted harvest leaves the dataset as
+    it was at the last commit, and resume() picks up from there.
+    """
+    MANIFEST = "_ads_dataset.json"
+    STAGING_PREFIX = ".staging-"
+    NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+    def __init__(self, path, partition_by="year", commit_every=100,
+                 max_open_files=64, compression="snappy",
+                 row_group_size=50000, max_buffered_rows=200000):
+        """
+        :param path: directory of the dataset, created if it does not exist
+        :param partition_by: the field to partition by, e.g. "year" or "pub";
+            it has to be in the "fl" of the queries that are written
+        :param commit_every: commit the written files every this many pages
+        :param max_open_files: maximum number of partition files written to
+            at once; the least recently used one is closed beyond that
+        :param compression: Parquet compression codec
+        :param row_group_size: number of rows buffered per partition before
+            they are written out as a row group; a file's last row group,
+            written when it is closed, may be smaller
+        :param max_buffered_rows: maximum number of rows buffered across all
+            of the open partition files; beyond that the largest buffers
+            are written out early, as smaller row groups
+        """
+        _require_pyarrow()
+        assert commit_every > 0, "commit_every must be greater than 0"
+        assert max_open_files > 0, "max_open_files must be greater than 0"
+        assert row_group_size > 0, "row_group_size must be greater than 0"
+        assert max_buffered_rows > 0, \
+            "max_buffered_rows must be greater than 0"
+        self.path = os.path.abspath(os.path.expanduser(path))
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path)
+        self.partition_by = partition_by
+        self.commit_every = commit_every
+        self.max_open_files = max_open_files
+        self.compression = compression
+        self.row_group_size = row_group_size
+        self.max_buffered_rows = max_buffered_rows
+        self.checkpoint = FileCheckpoint(
+            os.path.join(self.path, self.MANIFEST))
+        self._session = None
+        self._writers = OrderedDict()
+        self._closed = []
+        self._n_parts = 0
+
+    @property
+    def files(self):
+        """
+        Paths of the committed files, relative to the dataset directory
+        """
+        state = self.checkpoint.load()
+        return state.get("files", []) if state else []
+
+    def resume(self, **kwargs):
+        """
+        Return a SearchQuery that continues the last query written to this
+        dataset from the page after the last committed one
+        :param kwargs: passed on to SearchQuery.resume
+        """
+        return SearchQuery.resume(self.checkpoint, **kwargs)
+
+    def write(self, search_query):
+        """
+        Fetch the remaining pages of `search_query`, up to its max_pages, and
+        append them to the dataset. The query state is saved in the manifest
+        on every commit (instead of in the query's own checkpoint). The
+        columns are typed by ads.arrow.arrow_schema() of the query's fields,
+        so that the files of a resumed harvest have the same schema.
+        :type search_query: SearchQuery
+        :return: the number of records committed
+        """
+        assert self.partition_by in search_query._fields(), \
+            "partition_by must be one of the query's fields"
+        search_query.checkpoint = None
+        self._recover()
+        self._session = uuid.uuid4().hex[:12]
+        n_pages = n_records = 0
+        try:
+            schema = arrow_schema(search_query._fields())
+            for batch in search_query.iter_record_batches(schema=schema):
+                self._write_batch(batch)
+                n_pages += 1
+                n_records += batch.num_rows
+                if n_pages % self.commit_every == 0:
+                    self._commit(search_query)
+            self._commit(search_query)
+        finally:
+            self._discard()
+        return n_records
+
+    def to_arrow(self):
+        """
+        Read the committed files into an Arrow table, with the partition
+        field restored as a column
+        """
+        return pyarrow.dataset.dataset(
+            [os.path.join(self.path, f) for f in self.files],
+            format="parquet", partitioning="hive",
+            partition_base_dir=self.path,
+        ).to_table()
+
+    def _partition(self, value):
+        """
+        The directory of the partition for `value` of partition_by
+        """
+        if isinstance(value, list):
+            # multi-valued fields are partitioned by their first value
+            value = value[0] if value else None
+        if value is None:
+            value = self.NULL_PARTITION
+        else:
+            value = quote(u"{}".format(value).encode("utf-8"), safe="")
+        return "{}={}".format(self.partition_by, value)
+
+    def _staging(self):
+        return os.path.join(self.path, self.STAGING_PREFIX + self._session)
+
+    def _write_batch(self, batch):
+        """
+        Split a page's record batch by partition and append each part to
+        the buffer of its partition's file
+        """
+        table = pa.Table.from_batches([batch])
+        index = table.schema.get_field_index(self.partition_by)
+        rows = OrderedDict()
+        for i, value in enumerate(table.column(index).to_pylist()):
+            rows.setdefault(self._partition(value), []).append(i)
+        table = table.remove_column(index)
+        for partition, indices in rows.items():
+            self._writer(partition, table.schema).write(table.take(indices))
+        buffered = sum(w.n_pending for w in self._writers.values())
+        while buffered > self.max_buffered_rows:
+            writer = max(self._writers.values(), key=lambda w: w.n_pending)
+            buffered -= writer.n_pending
+            writer.flush()
+
+    def _writer(self, partition, schema):
+        """
+        The open _PartitionFile of `partition`, opening a new file (and
+        closing the least recently used one if need be) if there is none
+        """
+        writer = self._writers.pop(partition, None)
+        if writer is None:
+            if len(self._writers) >= self.max_open_files:
+                _, closed = self._writers.popitem(last=False)
+                self._close(closed)
+            if not os.path.isdir(self._staging()):
+                os.makedirs(self._staging())
+            self._n_parts += 1
+            name = "part-{}-{:05d}.parquet".format(self._session, self._n_parts)
+            writer = _PartitionFile(
+                os.path.join(self._staging(), name),
+                os.path.join(partition, name), schema, self.compression,
+                self.row_group_size
+            )
+        self._writers[partition] = writer
+        return writer
+
+    def _close(self, writer):
+        writer.close()
+        if os.path.exists(writer.staged):
+            self._closed.append((writer.staged, writer.final))
+
+    def _commit(self, search_query):
+        """
+        Close the open files, move every written file into the dataset and
+        save the manifest with the query state after the last page written
+        """
+        for writer in self._writers.values():
+            self._close(writer)
+        self._writers.clear()
+        committed = []
+        for staged, final in self._closed:
+            target = os.path.join(self.path, final)
+            if not os.path.isdir(os.path.dirname(target)):
+                os.makedirs(os.path.dirname(target))
+            getattr(os, "replace", os.rename)(staged, target)
+            committed.append(final)
+        self._closed = []
+        self.checkpoint.save({
+            "query": search_query._query,
+            "fetched": search_query._n_fetched,
+            "pages": search_query._n_pages,
+            "max_pages": search_query.max_pages,
+            "partition_by": self.partition_by,
+            "files": self.files + committed,
+        })
+
+    def _discard(self):
+        """
+        Drop the files of this session that have not been committed
+        """
+        for writer in self._writers.values():
+            writer.discard()
+        self._writers.clear()
+        self._closed = []
+        shutil.rmtree(self._staging(), ignore_errors=True)
+
+    def _recover(self):
+        """
+        Remove what an interrupted write left behind: staging directories,
+        and files that were moved into the dataset but not committed
+        """
+        committed = set(os.path.normpath(f) for f in self.files)
+        for name in os.listdir(self.path):
+            path = os.path.join(self.path, name)
+            if name.startswith(self.STAGING_PREFIX):
+                shutil.rmtree(path, ignore_errors=True)
+            elif name.startswith(self.partition_by + "=") and \
+                    os.path.isdir(path):
+                for part in os.listdir(path):
+                    if part.startswith("part-") and \
+                            os.path.join(name, part) not in committed:
+                        os.remove(os.path.join(path, part))
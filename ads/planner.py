@@ -0,0 +1,247 @@
+"""
+Planning of queries whose "q" or "fq" holds a disjunction too long to fit in
+the URL of a GET request
+"""
+
+import re
+
+from .bigquery import BigQuery
+from .search import SearchQuery, ShardedSearchQuery, MAX_URL_LENGTH, \
+    _encoded_length, _url_length
+
+# field:( at the start of a clause, e.g. bibcode:(a OR b)
+_FIELD_GROUP = re.compile(r"^\s*([\w.]+):\(")
+# top level operators that make splitting on OR change the meaning
+_OTHER_OPERATORS = (" AND ", " NOT ", " && ", " || ")
+
+
+def _scan(clause):
+    """
+    Yield (index, depth) of every character of `clause` that is outside
+    quotes, with the parenthesis depth before it; escaped characters are
+    skipped. Ends with (len(clause), depth) if the quotes are balanced.
+    """
+    depth, quoted, i = 0, False, 0
+    while i < len(clause):
+        c = clause[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == '"':
+            quoted = not quoted
+        elif not quoted:
+            yield i, depth
+            if c == "(":
+                depth += 1
+            elif c == ")":
+                depth -= 1
+        i += 1
+    if not quoted:
+        yield len(clause), depth
+
+
+def _split_or(clause):
+    """
+    Split `clause` on the ORs that are not inside quotes or parentheses
+    :return: the stripped terms, a single term if there is no such OR; None
+        if the parentheses or quotes don't balance, or if there are other
+        top level operators
+    """
+    terms, start, end = [], 0, None
+    for i, depth in _scan(clause):
+        end = i, depth
+        if depth < 0:
+            return None
+        if depth == 0 and clause.startswith(_OTHER_OPERATORS, i):
+            return None
+        if depth == 0 and clause.startswith(" OR ", i):
+            terms.append(clause[start:i].strip())
+            start = i + 4
+    if end != (len(clause), 0):
+        return None
+    terms.append(clause[start:].strip())
+    return [t for t in terms if t]
+
+
+def _closing_paren(clause, i):
+    """
+    The index of the parenthesis that closes the one at `i`, or None
+    """
+    for j, depth in _scan(clause):
+        if j > i and depth == 1 and clause[j] == ")":
+            return j
+    return None
+
+
+def split_disjunction(clause):
+    """
+    Parse a clause such as 'bibcode:("a" OR "b")' or 'a OR b' into the field
+    it is on, if any, and its terms. Clauses that mix OR with other
+    operators at the top level, e.g. 'a:(b OR c) AND d', are not split.
+    :return: (field or None, terms), or None if the clause is not a
+        disjunction
+    """
+    terms = _split_or(clause)
+    if terms is None:
+        return None
+    if len(terms) > 1:
+        return None, terms
+    clause = clause.strip()
+    match = _FIELD_GROUP.match(clause)
+    # the group has to span the rest of the clause
+    if match and _closing_paren(clause, match.end() - 1) == len(clause) - 1:
+        terms = _split_or(clause[match.end():-1])
+        if terms is not None and len(terms) > 1:
+            return match.group(1), terms
+    return None
+
+
+def _join(field, terms):
+    clause = " OR ".join(terms)
+    return "{}:({})".format(field, clause) if field else clause
+
+
+def chunk_terms(field, terms, budget):
+    """
+    Pack `terms` into as few disjunctions as possible whose encoded length
+    is at most `budget`
+    :return: the clauses of the chunks
+    """
+    chunks, chunk = [], []
+    for term in terms:
+        if chunk and _encoded_length(_join(field, chunk + [term])) > budget:
+            chunks.append(_join(field, chunk))
+            chunk = []
+        chunk.append(term)
+    chunks.append(_join(field, chunk))
+    return chunks
+
+
+class ChunkedSearchQuery(ShardedSearchQuery):
+    """
+    Runs a query whose "q" or "fq" holds an OR-list too long for a URL as
+    one query per chunk of the list, each sized so that its URL stays under
+    max_url_length. The chunks are paginated concurrently, like the shards
+    of a ShardedSearchQuery, and merged back into the requested sort order.
+    A record that matches more than one chunk is only returned once.
+    """
+    MAX_URL_LENGTH = MAX_URL_LENGTH
+
+    def __init__(self, *args, **kwargs):
+        """
+        :param max_url_length: maximum length of the URL of every request,
+            by default MAX_URL_LENGTH
+        :param args: args passed on to SearchQuery
+        :param kwargs: kwargs passed on to SearchQuery. max_pages applies
+            to each chunk. prefetch defaults to 1 so that every chunk is
+            fetched on its own background thread; 0 fetches the chunks one
+            after the other.
+        """
+        self.max_url_length = kwargs.pop("max_url_length",
+                                         self.MAX_URL_LENGTH)
+        self._seen = set()
+        super(ChunkedSearchQuery, self).__init__(None, *args, **kwargs)
+
+    def _shard_queries(self, shards, fl):
+        """
+        The query dicts of the chunks of the longest disjunction in "q" or
+        "fq"; just this query if it is short enough
+        """
+        query = dict(self._query, fl=fl)
+        if _url_length(query) <= self.max_url_length:
+            return [query]
+        param, index, (field, terms) = _longest_disjunction(query)
+        rest = dict(query)
+        _set_clause(rest, param, index, "")
+        budget = self.max_url_length - _url_length(rest)
+        chunks = chunk_terms(field, terms, budget)
+        if any(_encoded_length(c) > budget for c in chunks):
+            raise ValueError("The query is too long to be split into "
+                             "chunks of {} characters".format(
+                                 self.max_url_length))
+        queries = []
+        for chunk in chunks:
+            query_dict = dict(query)
+            _set_clause(query_dict, param, index, chunk)
+            queries.append(query_dict)
+        return queries
+
+    def _merge(self):
+        for article in super(ChunkedSearchQuery, self)._merge():
+            if article.id not in self._seen:
+                self._seen.add(article.id)
+                yield article
+
+
+def _clauses(query):
+    """
+    Yield (param, index, clause) of "q" and of every "fq" clause; index is
+    None for a param that is a single string
+    """
+    for param in ("q", "fq"):
+        value = query.get(param)
+        if isinstance(value, list):
+            for i, clause in enumerate(value):
+                yield param, i, clause
+        elif value:
+            yield param, None, value
+
+
+def _set_clause(query, param, index, clause):
+    if index is None:
+        query[param] = clause
+    else:
+        query[param] = list(query[param])
+        query[param][index] = clause
+
+
+def _longest_disjunction(query):
+    """
+    The (param, index, (field, terms)) of the longest splittable clause of
+    `query`
+    :raises ValueError: if there is none
+    """
+    found = [(param, index, split_disjunction(clause))
+             for param, index, clause in _clauses(query)]
+    found = [f for f in found if f[2] is not None]
+    if not found:
+        raise ValueError("The query is too long and has no OR-list in "
+                         "q or fq to split")
+    return max(found, key=lambda f: len(_join(*f[2])))
+
+
+def plan_query(q=None, fq=None, max_url_length=None, **kwargs):
+    """
+    Return a query that fetches the results of these SearchQuery params
+    without going over the URL length limit of GET requests:
+
+    - a SearchQuery if the URL is short enough;
+    - a BigQuery if the longest OR-list is a list of bibcodes, which are then
+      POSTed to the bigquery service instead of being put in the URL;
+    - a ChunkedSearchQuery otherwise.
+
+    :param q: solr "q" param
+    :param fq: solr "fq" param, a string or a list
+    :param max_url_length: maximum length of the URL of every request, by
+        default ChunkedSearchQuery.MAX_URL_LENGTH
+    :param kwargs: kwargs passed on to the query, e.g. fl, rows or
+        max_pages
+    """
+    if max_url_length is None:
+        max_url_length = ChunkedSearchQuery.MAX_URL_LENGTH
+    sq = SearchQuery(q=q, fq=fq, **kwargs)
+    if _url_length(sq.query) <= max_url_length:
+        return sq
+
+    param, index, (field, terms) = _longest_disjunction(sq.query)
+    # bigquery takes literal bibcodes only
+    if field == "bibcode" and not any(c in t for t in terms for c in "*?"):
+        rest = dict(q=sq.query["q"], fq=sq.query.get("fq"))
+        _set_clause(rest, param, index, None)
+        if isinstance(rest["fq"], list):
+            rest["fq"] = [c for c in rest["fq"] if c is not None] or None
+        bibcodes = [t.strip('"') for t in terms]
+        return BigQuery(bibcodes, q=rest["q"] or "*:*", fq=rest["fq"],
+                        **kwargs)
+    return ChunkedSearchQuery(q=q, fq=fq, max_url_length=max_url_length,
+                              **kwargs)
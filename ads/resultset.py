@@ -0,0 +1,282 @@
+"""
+Columnar view of search results, for analytics over many records
+"""
+
+from collections import OrderedDict
+import numbers
+
+import six
+
+from . import schema
+from .schema import np, _require_numpy
+
+
+def _column(values):
+    """
+    Turn the values of one field into a column: a numpy array for numeric
+    fields (float with nan for missing values if any are missing) and a
+    list for everything else
+    """
+    present = [v for v in values if v is not None]
+    if present and all(isinstance(v, numbers.Number) and
+                       not isinstance(v, bool) for v in present):
+        if len(present) == len(values) and \
+                all(isinstance(v, numbers.Integral) for v in present):
+            return np.array(values, dtype=np.int64)
+        return np.array([np.nan if v is None else v for v in values],
+                        dtype=np.float64)
+    return list(values)
+
+
+def _take(column, indices):
+    """
+    Select `indices` of a column
+    """
+    if isinstance(column, np.ndarray):
+        return column[indices]
+    return [column[i] for i in indices]
+
+
+def _strings(column):
+    """
+    The values of a list column that holds only strings and None, as a
+    numpy string array and a mask of the missing values; None if the column
+    holds anything else, e.g. lists
+    """
+    missing = np.array([v is None for v in column], dtype=bool)
+    present = [v for v in column if v is not None]
+    if not all(isinstance(v, six.string_types) for v in present):
+        return None
+    strings = np.empty(len(column), dtype=np.array(present or [u""]).dtype)
+    strings[~missing] = present
+    return strings, missing
+
+
+def _codes(column):
+    """
+    Factorize a column: return (unique values, integer code per row).
+    Integer, date and string columns are factorized by numpy; other
+    columns, e.g. of lists, value by value.
+    """
+    if isinstance(column, np.ndarray) and column.dtype.kind in "iuM":
+        return np.unique(column, return_inverse=True)
+    strings = None if isinstance(column, np.ndarray) else _strings(column)
+    if strings is not None:
+        strings, missing = strings
+        keys, first, inverse = np.unique(
+            strings[~missing], return_index=True, return_inverse=True)
+        # None gets the code after those of the strings
+        keys = keys.tolist() + [None]
+        first = np.flatnonzero(~missing)[first]
+        codes = np.full(len(column), len(keys) - 1, dtype=np.int64)
+        codes[~missing] = inverse.ravel()
+        if missing.any():
+            first = np.append(first, np.flatnonzero(missing)[0])
+        else:
+            keys.pop()
+        # number the values in order of first appearance
+        order = np.argsort(first, kind="mergesort")
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        return [keys[i] for i in order], rank[codes]
+    index = OrderedDict()
+    codes = np.empty(len(column), dtype=np.int64)
+    for i, value in enumerate(column):
+        key = tuple(value) if isinstance(value, list) else value
+        codes[i] = index.setdefault(key, len(index))
+    return list(index), codes
+
+
+class ResultSet(object):
+    """
+    Search results stored by field: one numpy array per numeric field and
+    one list per other field. Built directly from solr docs, so no Article
+    objects are created.
+    """
+
+    AGGREGATES = ("count", "sum", "mean", "min", "max")
+
+    def __init__(self, columns):
+        """
+        :param columns: field name to column, all of the same length
+        :type columns: OrderedDict
+        """
+        _require_numpy("ResultSet")
+        self.columns = OrderedDict(columns)
+        lengths = set(len(c) for c in self.columns.values())
+        assert len(lengths) <= 1, "all columns must have the same length"
+        self._length = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_docs(cls, docs, fields=None, typed=False):
+        """
+        Build a ResultSet from solr docs
+        :param docs: solr docs, e.g. SolrResponse.docs
+        :type docs: list of dict
+        :param fields: fields to keep; defaults to every field seen in docs
+        :type fields: list
+        :param typed: convert the columns of the fields in ads.schema to
+            their types, e.g. pubdate to a datetime64 array
+        """
+        _require_numpy("ResultSet")
+        if fields is None:
+            fields = list(OrderedDict.fromkeys(k for doc in docs for k in doc))
+        columns = OrderedDict()
+        for field in fields:
+            values = [doc.get(field) for doc in docs]
+            if typed and schema.field_type(field) is not schema.RAW:
+                columns[field] = schema.convert_column(field, values)
+            else:
+                columns[field] = _column(values)
+        return cls(columns)
+
+    @classmethod
+    def concat(cls, result_sets):
+        """
+        Join ResultSets with the same fields end to end
+        :type result_sets: list of ResultSet
+        """
+        result_sets = list(result_sets)
+        if not result_sets:
+            return cls(OrderedDict())
+        columns = OrderedDict()
+        for field in result_sets[0].fields:
+            parts = [rs[field] for rs in result_sets]
+            if all(isinstance(p, np.ndarray) for p in parts):
+                columns[field] = np.concatenate(parts)
+            else:
+                columns[field] = _column(
+                    [v for p in parts for v in
+                     (p.tolist() if isinstance(p, np.ndarray) else p)])
+        return cls(columns)
+
+    @property
+    def fields(self):
+        return list(self.columns)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, field):
+        return self.columns[field]
+
+    def __contains__(self, field):
+        return field in self.columns
+
+    def __repr__(self):
+        return "<ResultSet {} rows, fields={}>".format(len(self), self.fields)
+
+    def take(self, indices):
+        """
+        Return a ResultSet of the rows at `indices`
+        :param indices: integer positions
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        return ResultSet(OrderedDict(
+            (field, _take(column, indices))
+            for field, column in six.iteritems(self.columns)
+        ))
+
+    def filter(self, mask):
+        """
+        Return a ResultSet of the rows where `mask` is true
+        :param mask: boolean array, e.g. rs["citation_count"] > 10
+        """
+        mask = np.asarray(mask, dtype=bool)
+        assert len(mask) == len(self), "mask must have one value per row"
+        return self.take(np.flatnonzero(mask))
+
+    def sort(self, field, descending=False):
+        """
+        Return a ResultSet sorted by `field`. The sort is stable and missing
+        values sort last.
+        :param field: the field to sort by
+        :param descending: sort from largest to smallest
+        """
+        column = self.columns[field]
+        strings = None if isinstance(column, np.ndarray) else _strings(column)
+        if isinstance(column, np.ndarray):
+            if column.dtype.kind == "M":
+                # sort dates by their integer value, with NaT as nan
+                keys = column.astype(np.int64).astype(np.float64)
+                keys[np.isnat(column)] = np.nan
+            else:
+                keys = column
+            keys = -keys if descending else keys
+            order = np.argsort(keys, kind="mergesort")
+        elif strings is not None:
+            strings, missing = strings
+            present = np.flatnonzero(~missing)
+            if descending:
+                # sort the rows in reverse so that ties keep their order
+                present = present[::-1]
+            present = present[np.argsort(strings[present], kind="mergesort")]
+            if descending:
+                present = present[::-1]
+            order = np.concatenate([present, np.flatnonzero(missing)])
+        else:
+            # python's sort stays stable when reversed
+            present = [i for i, v in enumerate(column) if v is not None]
+            present.sort(key=column.__getitem__, reverse=descending)
+            order = present + [i for i, v in enumerate(column) if v is None]
+        return self.take(order)
+
+    def group_by(self, field, **aggregates):
+        """
+        Group the rows by the values of `field` and aggregate other fields
+        :param field: the field to group by
+        :param aggregates: output name to (field, aggregate), where aggregate
+            is one of ResultSet.AGGREGATES, e.g.
+            citations=("citation_count", "sum")
+        :return: a ResultSet with one row per distinct value of `field`, and
+            a "count" column unless another aggregate is named so. Groups
+            are ordered by value for integer fields and by first appearance
+            otherwise.
+        """
+        keys, codes = _codes(self.columns[field])
+        n = len(keys)
+        columns = OrderedDict()
+        columns[field] = keys if isinstance(keys, list) else np.asarray(keys)
+        counts = np.bincount(codes, minlength=n)
+        aggregates.setdefault("count", (field, "count"))
+        for name, (source, how) in six.iteritems(aggregates):
+            assert how in self.AGGREGATES, \
+                "aggregate must be one of {}".format(self.AGGREGATES)
+            if how == "count":
+                columns[name] = counts
+                continue
+            values = np.asarray(self.columns[source], dtype=np.float64)
+            if how in ("sum", "mean"):
+                sums = np.bincount(codes, weights=np.nan_to_num(values),
+                                   minlength=n)
+                if how == "sum":
+                    source_column = self.columns[source]
+                    if isinstance(source_column, np.ndarray) and \
+                            source_column.dtype.kind in "iu":
+                        sums = sums.astype(np.int64)
+                    columns[name] = sums
+                else:
+                    present = np.bincount(
+                        codes, weights=(~np.isnan(values)).astype(float),
+                        minlength=n)
+                    with np.errstate(invalid="ignore", divide="ignore"):
+                        columns[name] = sums / present
+            else:
+                fill = np.inf if how == "min" else -np.inf
+                result = np.full(n, fill)
+                ufunc = np.fmin if how == "min" else np.fmax
+                ufunc.at(result, codes, values)
+                result[np.isinf(result)] = np.nan
+                columns[name] = result
+        return ResultSet(columns)
+
+    def to_dict(self):
+        """
+        Return the columns as a dict of lists
+        """
+        return OrderedDict(
+            (field, column.tolist() if isinstance(column, np.ndarray)
+             else list(column))
+            for field, column in six.iteritems(self.columns)
+        )
+
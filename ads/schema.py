@@ -0,0 +1,176 @@
+"""
+Types of the solr fields of an Article, for converting their raw JSON values
+on demand: one value at a time, or a whole column at once with numpy
+"""
+
+import datetime
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency
+    np = None
+
+
+def _require_numpy(feature="column conversion"):
+    if np is None:
+        raise ImportError("{} requires numpy: pip install numpy".format(
+            feature))
+
+
+class FieldType(object):
+    """
+    How to convert the raw values of a field: `convert` turns one value
+    into a python object and `column` a list of values into a column
+    """
+
+    def __init__(self, name, convert, column):
+        """
+        :param name: name of the type, e.g. "int"
+        :param convert: function of one raw value, not called for None
+        :param column: function of a list of raw values (None for missing)
+        """
+        self.name = name
+        self._convert = convert
+        self._column = column
+
+    def convert(self, value):
+        """
+        Convert a single raw value; None stays None
+        """
+        return None if value is None else self._convert(value)
+
+    def column(self, values):
+        """
+        Convert the raw values of a whole page at once. Requires numpy.
+        :type values: list
+        """
+        _require_numpy()
+        return self._column(list(values))
+
+    def __repr__(self):
+        return "<FieldType {}>".format(self.name)
+
+
+def _parse_date(value):
+    """
+    Parse an ADS date, "YYYY-MM-DD" where an unknown month or day is 00.
+    The 00s are read as the first month or day.
+    """
+    year, month, day = (int(part) for part in value[:10].split("-"))
+    return datetime.date(year, month or 1, day or 1)
+
+
+def _parse_datetime(value):
+    """
+    Parse a solr timestamp, e.g. "2015-04-11T13:53:02.829Z", as a naive UTC
+    datetime
+    """
+    value = value.rstrip("Z")
+    fmt = "%Y-%m-%dT%H:%M:%S.%f" if "." in value else "%Y-%m-%dT%H:%M:%S"
+    return datetime.datetime.strptime(value, fmt)
+
+
+def _int_column(values):
+    """
+    int64, or float64 with nan where values are missing
+    """
+    column = np.array([np.nan if v is None else v for v in values],
+                      dtype=np.float64)
+    if not np.isnan(column).any():
+        column = column.astype(np.int64)
+    return column
+
+
+def _float_column(values):
+    return np.array([np.nan if v is None else v for v in values],
+                    dtype=np.float64)
+
+
+def _date_column(values):
+    """
+    datetime64[D], NaT where values are missing
+    """
+    column = np.array(["NaT" if v is None else v[:10] for v in values],
+                      dtype="U10")
+    # unknown months and days are read as the first, as in _parse_date
+    column = np.char.replace(column, "-00", "-01")
+    return column.astype("datetime64[D]")
+
+
+def _datetime_column(values):
+    """
+    datetime64[ms] in UTC, NaT where values are missing
+    """
+    column = np.array(["NaT" if v is None else v for v in values])
+    return np.char.rstrip(column, "Z").astype("datetime64[ms]")
+
+
+def _as_list(value):
+    return value if isinstance(value, list) else [value]
+
+
+RAW = FieldType("raw", lambda value: value, list)
+INT = FieldType("int", int, _int_column)
+FLOAT = FieldType("float", float, _float_column)
+DATE = FieldType("date", _parse_date, _date_column)
+DATETIME = FieldType("datetime", _parse_datetime, _datetime_column)
+LIST = FieldType(
+    "list", _as_list,
+    lambda values: [[] if v is None else _as_list(v) for v in values]
+)
+
+
+# The type of each Article field whose raw value is not already what it
+# represents; every other field is left as it is (RAW)
+FIELD_TYPES = {
+    "citation_count": INT,
+    "read_count": INT,
+    "year": INT,
+    "cite_read_boost": FLOAT,
+    "pubdate": DATE,
+    "indexstamp": DATETIME,
+    "date": DATETIME,
+}
+FIELD_TYPES.update(dict.fromkeys([
+    "aff", "alternate_bibcode", "alternate_title", "arxiv_class", "author",
+    "bibgroup", "citation", "data", "database", "doi", "grant", "identifier",
+    "keyword", "orcid_other", "orcid_pub", "orcid_user", "page", "property",
+    "reference", "title", "vizier",
+], LIST))
+
+
+def register_field(field, field_type):
+    """
+    Set the type of `field`, e.g. for fields that Article does not know
+    :type field_type: FieldType
+    """
+    assert isinstance(field_type, FieldType), "field_type must be a FieldType"
+    FIELD_TYPES[field] = field_type
+
+
+def field_type(field):
+    """
+    The FieldType of `field`
+    """
+    return FIELD_TYPES.get(field, RAW)
+
+
+def convert(field, value):
+    """
+    Convert a single raw value of `field`; missing values (None) stay None,
+    except for list fields, where they become []
+    """
+    ftype = field_type(field)
+    if value is None and ftype is LIST:
+        return []
+    return ftype.convert(value)
+
+
+def convert_column(field, values):
+    """
+    Convert the raw values of `field` for a whole page at once. Requires
+    numpy.
+    :param values: raw values, None where missing
+    :type values: list
+    """
+    return field_type(field).column(values)
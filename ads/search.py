@@ -6,13 +6,220 @@ import warnings
 import re
 import six
 import math
+import heapq
+import threading
+from collections import OrderedDict
+import time
+from concurrent.futures import ThreadPoolExecutor
+from six.moves import queue
+from six.moves.collections_abc import MutableMapping, Sequence
+from six.moves.urllib.parse import urlencode
+import bisect
+import weakref
 
 from .config import SEARCH_URL
 from .exceptions import SolrResponseParseError, APIResponseError
 from .base import BaseQuery, APIResponse
 from .metrics import MetricsQuery
 from .export import ExportQuery
-from .utils import cached_property
+from .checkpoint import FileCheckpoint
+from .facets import FacetResult, facet_params
+from .stats import StatsResult, stats_params
+from .resultset import ResultSet
+from . import arrow
+from .utils import cached_field, cached_computed_field
+from . import schema
+
+try:
+    import ijson
+    from ijson.common import ObjectBuilder
+except ImportError:  # ijson is an optional dependency
+    ijson = None
+
+
+def _require_ijson():
+    if ijson is None:
+        raise ImportError("streaming responses require ijson: pip install ijson")
+
+
+# Longest URL that is safe to send to the API through its proxies
+MAX_URL_LENGTH = 4000
+# room left in the URL for the cursorMark of the pages after the first
+_CURSOR_ROOM = 200
+
+
+def _encode(value):
+    return value.encode("utf-8") if isinstance(value, six.text_type) \
+        else value
+
+
+def _encoded_length(value):
+    """
+    The length of `value` once it is encoded as a query string value
+    """
+    return len(urlencode({"": _encode(value)})) - 1
+
+
+def _url_length(query):
+    """
+    The length of the URL of a search request for `query`, including room
+    for the cursorMark of later pages if it is paginated by cursor
+    """
+    params = [(k, _encode(v)) for k, values in six.iteritems(query)
+              for v in (values if isinstance(values, list) else [values])]
+    room = _CURSOR_ROOM if "cursorMark" in query else 0
+    return len(SEARCH_URL) + 1 + len(urlencode(params)) + room
+
+
+class _Missing(object):
+    """
+    Marks a field of a _Record that has no value
+    """
+    __slots__ = ()
+
+    def __reduce__(self):
+        # unpickles as the module's single instance
+        return "_MISSING"
+
+    def __repr__(self):
+        return "_MISSING"
+
+
+_MISSING = _Missing()
+
+
+class _Layout(object):
+    """
+    The field names of a set of _Records, mapped to the position of their
+    values. All of the records of a SolrResponse share one layout, so that
+    each record only has to store a list of values.
+    """
+    __slots__ = ("names", "index", "_lock")
+
+    def __init__(self, names=()):
+        """
+        :param names: initial field names
+        """
+        self.names = []
+        self.index = {}
+        self._lock = threading.Lock()
+        for name in names:
+            self.add(name)
+
+    def add(self, name):
+        """
+        Return the position of field `name`, adding it if it is new
+        """
+        i = self.index.get(name)
+        if i is None:
+            with self._lock:
+                i = self.index.get(name)
+                if i is None:
+                    i = len(self.names)
+                    self.names.append(name)
+                    self.index[name] = i
+        return i
+
+    def __reduce__(self):
+        # pickled once per pickle, however many records share it
+        return _Layout, (list(self.names),)
+
+
+class _Record(MutableMapping):
+    """
+    A dict-like solr document that stores its values in a list laid out by
+    a shared _Layout
+    """
+    __slots__ = ("_layout", "_values")
+
+    def __init__(self, layout, values):
+        """
+        :param layout: field layout shared with sibling records
+        :type layout: _Layout
+        :param values: values in layout order; _MISSING marks absent fields
+        :type values: list
+        """
+        self._layout = layout
+        self._values = values
+
+    def __getitem__(self, key):
+        i = self._layout.index.get(key)
+        if i is None or i >= len(self._values) or self._values[i] is _MISSING:
+            raise KeyError(key)
+        return self._values[i]
+
+    def __setitem__(self, key, value):
+        i = self._layout.add(key)
+        values = self._values
+        if i >= len(values):
+            values.extend([_MISSING] * (i + 1 - len(values)))
+        values[i] = value
+
+    def __delitem__(self, key):
+        self[key]
+        self._values[self._layout.index[key]] = _MISSING
+
+    def __iter__(self):
+        for name, value in zip(self._layout.names, self._values):
+            if value is not _MISSING:
+                yield name
+
+    def __len__(self):
+        return sum(1 for value in self._values if value is not _MISSING)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def __reduce__(self):
+        return _Record, (self._layout, list(self._values))
+
+
+class _Interner(object):
+    """
+    A table of the distinct string values of some fields. Docs decoded from
+    different pages get their own copy of every repeated value, e.g. each
+    author name; interning them makes them share one string object.
+    """
+
+    def __init__(self, fields):
+        """
+        :param fields: the (low cardinality) fields to intern
+        :type fields: list
+        """
+        self.fields = list(fields)
+        self.table = {}
+
+    def __call__(self, doc):
+        """
+        Intern the values of `doc`, in place
+        :type doc: dict
+        """
+        table = self.table
+        for field in self.fields:
+            value = doc.get(field)
+            if isinstance(value, six.string_types):
+                doc[field] = table.setdefault(value, value)
+            elif isinstance(value, list):
+                for i, item in enumerate(value):
+                    if isinstance(item, six.string_types):
+                        value[i] = table.setdefault(item, item)
+
+
+class _TypedFields(object):
+    """
+    The fields of an article converted to their types in ads.schema, e.g.
+    article.typed.pubdate is a datetime.date. Fields are loaded as usual
+    and converted when they are accessed.
+    """
+    __slots__ = ("_article",)
+
+    def __init__(self, article):
+        self._article = article
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return schema.convert(name, getattr(self._article, name))
 
 
 class Article(object):
@@ -25,13 +232,55 @@ class Article(object):
     # services; this is why it is currently impossible for it to live in
     # base.py, which is the most logical place for it.
 
+    # Field values live only in _raw, a _Record laid out like its siblings'.
+    # _cache holds values that come from other services (metrics, ...) and
+    # _page the articles of the SolrResponse this article came from, if any;
+    # lazily loaded fields are fetched for all of them at once.
+    __slots__ = ("_raw", "_cache", "_page")
+
     def __init__(self, **kwargs):
         """
         :param kwargs: Set object attributes from kwargs
         """
-        self._raw = kwargs
-        for key, value in six.iteritems(kwargs):
-            setattr(self, key, value)
+        self._raw = _Record(_Layout(kwargs), list(kwargs.values()))
+        self._cache = None
+        self._page = None
+
+    @classmethod
+    def _from_record(cls, record, page=None):
+        """
+        Build an article around an existing _Record
+        :param record: the article's field values
+        :type record: _Record
+        :param page: sibling articles from the same SolrResponse
+        :type page: list
+        """
+        article = cls.__new__(cls)
+        article._raw = record
+        article._cache = None
+        article._page = page
+        return article
+
+    def __reduce__(self):
+        # Only the field data is kept: fields that were never loaded are still
+        # loaded on access after unpickling, and _cache is fetched again
+        return _article_from_record, (type(self), self._raw)
+
+    def __getattr__(self, name):
+        # Fields without a property of their own, e.g. "bibstem"
+        if name.startswith("__") or name in Article.__slots__:
+            raise AttributeError(name)
+        try:
+            return self._raw[name]
+        except KeyError:
+            raise AttributeError(
+                "'Article' object has no attribute '{}'".format(name))
+
+    def __setattr__(self, name, value):
+        if name in Article.__slots__ or hasattr(type(self), name):
+            object.__setattr__(self, name, value)
+        else:
+            self._raw[name] = value
 
     def __str__(self):
         if six.PY3:
@@ -65,6 +314,13 @@ class Article(object):
             
         return hash(bibcode)
 
+    @property
+    def typed(self):
+        """
+        The fields of this article converted to python types, see ads.schema
+        """
+        return _TypedFields(self)
+
     def keys(self):
         return self._raw.keys()
 
@@ -124,6 +380,11 @@ class Article(object):
         """
         if not hasattr(self, "id") or self.id is None:
             raise APIResponseError("Cannot query an article without an id")
+        # Load the field for every article of the same page in one go, rather
+        # than making one request per article
+        if self._page is not None and field not in _NON_SOLR_FIELDS:
+            _hydrate(self._page, [field])
+            return self._raw.get(field)
         sq = next(SearchQuery(q="id:{}".format(self.id), fl=field))
         # If the requested field is not present in the returning Solr doc,
         # return None instead of hitting _get_field again.
@@ -131,7 +392,7 @@ class Article(object):
             # These fields will never be in the result solr document;
             # pass through to __getattribute__ to allow the relevant
             # secondary service queries
-            if field in ["reference", "citation", "metrics", "bibtex"]:
+            if field in _NON_SOLR_FIELDS:
                 pass
             else:
                 return None
@@ -139,111 +400,111 @@ class Article(object):
         self._raw[field] = value
         return value
 
-    @cached_property
+    @cached_field
     def abstract(self):
         return self._get_field('abstract')
 
-    @cached_property
+    @cached_field
     def ack(self):
         return self._get_field('ack')
 
-    @cached_property
+    @cached_field
     def aff(self):
         return self._get_field('aff')
 
-    @cached_property
+    @cached_field
     def alternate_bibcode(self):
         return self._get_field('alternate_bibcode')
 
-    @cached_property
+    @cached_field
     def alternate_title(self):
         return self._get_field('alternate_title')
 
-    @cached_property
+    @cached_field
     def arxiv_class(self):
         return self._get_field('arxiv_class')
 
-    @cached_property
+    @cached_field
     def author(self):
         return self._get_field('author')
 
-    @cached_property
+    @cached_field
     def citation_count(self):
         return self._get_field('citation_count')
 
-    @cached_property
+    @cached_field
     def bibcode(self):
         return self._get_field('bibcode')
 
-    @cached_property
+    @cached_field
     def bibgroup(self):
         return self._get_field('bibgroup')
 
-    @cached_property
+    @cached_field
     def copyright(self):
         return self._get_field('copyright')
 
-    @cached_property
+    @cached_field
     def data(self):
         return self._get_field('data')
 
-    @cached_property
+    @cached_field
     def database(self):
         return self._get_field('database')
 
-    @cached_property
+    @cached_field
     def doctype(self):
         return self._get_field('doctype')
 
-    @cached_property
+    @cached_field
     def doi(self):
         return self._get_field('doi')
 
-    @cached_property
+    @cached_field
     def identifier(self):
         return self._get_field('identifier')
 
-    @cached_property
+    @cached_field
     def indexstamp(self):
         return self._get_field('indexstamp')
 
-    @cached_property
+    @cached_field
     def first_author(self):
         return self._get_field('first_author')
 
-    @cached_property
+    @cached_field
     def grant(self):
         return self._get_field('grant')
 
-    @cached_property
+    @cached_field
     def issue(self):
         return self._get_field('issue')
 
-    @cached_property
+    @cached_field
     def keyword(self):
         return self._get_field('keyword')
 
-    @cached_property
+    @cached_field
     def page(self):
         return self._get_field('page')
 
-    @cached_property
+    @cached_field
     def property(self):
         return self._get_field('property')
 
-    @cached_property
+    @cached_field
     def pub(self):
         return self._get_field('pub')
 
-    @cached_property
+    @cached_field
     def pubdate(self):
         return self._get_field('pubdate')
 
-    @cached_property
+    @cached_field
     def read_count(self):
         return self._get_field('read_count')
 
-    @cached_property
+    @cached_computed_field
     def reference(self):
         q = SearchQuery(
             q='references(id:{})'.format(self.id),
@@ -251,7 +512,7 @@ class Article(object):
         )
         return [a.bibcode for a in q]
 
-    @cached_property
+    @cached_computed_field
     def citation(self):
         q = SearchQuery(
             q='citations(id:{})'.format(self.id),
@@ -259,44 +520,44 @@ class Article(object):
         )
         return [a.bibcode for a in q]
 
-    @cached_property
+    @cached_field
     def title(self):
         return self._get_field('title')
 
-    @cached_property
+    @cached_field
     def vizier(self):
         return self._get_field('vizier')
 
-    @cached_property
+    @cached_field
     def volume(self):
         return self._get_field('volume')
 
-    @cached_property
+    @cached_field
     def year(self):
         return self._get_field('year')
     
-    @cached_property
+    @cached_field
     def orcid_pub(self):
         """ORCiD identifiers assigned by publishers"""
         return self._get_field('orcid_pub')
     
-    @cached_property
+    @cached_field
     def orcid_user(self):
         """ORCiD claims by ADS verified users."""
         return self._get_field('orcid_user')
     
-    @cached_property
+    @cached_field
     def orcid_other(self):
         """ORCiD claims by everybody else."""
         return self._get_field('orcid_other')
     
-    @cached_property
+    @cached_computed_field
     def metrics(self):
         warnings.warn("metrics should be queried with ads.MetricsQuery(); You will"
                       "hit API ratelimits very quickly otherwise.", UserWarning)
         return MetricsQuery(bibcodes=self.bibcode).execute()
 
-    @cached_property
+    @cached_computed_field
     def bibtex(self):
         """Return a BiBTeX entry for the current article."""
         warnings.warn("bibtex should be queried with ads.ExportQuery(); You will "
@@ -304,6 +565,214 @@ class Article(object):
         return ExportQuery(bibcodes=self.bibcode, format="bibtex").execute()
 
 
+# Article fields that are not solr fields, and are loaded from other services
+_NON_SOLR_FIELDS = ["reference", "citation", "metrics", "bibtex"]
+
+
+def _article_from_record(cls, record):
+    """
+    Unpickle an Article of class `cls`
+    """
+    return cls._from_record(record)
+
+
+def _hydrate(articles, fields, chunk_size=100, token=None):
+    """
+    Load `fields` for every article in `articles` that does not have them
+    yet, with one id:(a OR b OR ...) query per `chunk_size` articles
+    :param articles: articles to load the fields for
+    :type articles: list of Article
+    :param fields: solr fields to load
+    :type fields: list
+    :param chunk_size: number of articles per request
+    :param token: optional API token to use for the requests
+    """
+    fields = [f for f in fields if f not in _NON_SOLR_FIELDS]
+    by_id = OrderedDict()
+    for article in articles:
+        missing = [f for f in fields if f not in article._raw]
+        if missing and article._raw.get("id") is not None:
+            by_id.setdefault(str(article._raw["id"]), []).append(article)
+    if not by_id:
+        return
+
+    ids = list(by_id)
+    for i in range(0, len(ids), chunk_size):
+        chunk = ids[i:i + chunk_size]
+        sq = SearchQuery(q="id:({})".format(" OR ".join(chunk)), fl=fields,
+                         rows=len(chunk), token=token)
+        sq.execute()
+        docs = dict((str(doc.get("id")), doc) for doc in sq.response.docs)
+        for _id in chunk:
+            doc = docs.get(_id, {})
+            for article in by_id[_id]:
+                for field in fields:
+                    if field not in article._raw:
+                        article._raw[field] = doc.get(field)
+
+
+class _ArticleSequence(Sequence):
+    """
+    A read-only sequence of articles that otherwise behaves like the list it
+    used to be: it compares equal to a list of the same articles, can be
+    added to lists and sorted in place, and list(articles) or copy() give a
+    plain list, e.g. for json
+    """
+
+    def __eq__(self, other):
+        if not isinstance(other, (list, Sequence)):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def copy(self):
+        return list(self)
+
+    def sort(self, key=None, reverse=False):
+        """
+        Sort the articles in place, like list.sort(); builds every article
+        """
+        self._replace(sorted(self, key=key, reverse=reverse))
+
+    def _replace(self, articles):
+        raise NotImplementedError
+
+
+class _LazyArticles(_ArticleSequence):
+    """
+    The articles of a SolrResponse, each built from its doc when it is first
+    accessed. Fields in "fl" that are missing from a doc are set to None
+    (issue #38) through the shared field layout, leaving the docs untouched.
+    """
+
+    def __init__(self, docs, fl):
+        """
+        :param docs: solr docs
+        :type docs: list of dict
+        :param fl: the "fl" of the response
+        :type fl: list
+        """
+        self._docs = docs
+        self._layout = _Layout(fl)
+        # only the fields of fl default to None; those that articles add to
+        # the layout later are missing from the other docs
+        self._n_fl = len(self._layout.names)
+        self._built = [None] * len(docs)
+        self._n_built = 0
+
+    def __len__(self):
+        return len(self._built)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        article = self._built[i]
+        if article is None:
+            article = self._built[i] = self._build(self._docs[i])
+            self._n_built += 1
+            if self._n_built == len(self._built):
+                # every article has its own record now
+                self._docs = None
+        return article
+
+    def _build(self, doc):
+        layout, n_fl = self._layout, self._n_fl
+        record = _Record(layout, [
+            doc.get(name) if i < n_fl else doc.get(name, _MISSING)
+            for i, name in enumerate(layout.names)
+        ])
+        for key in doc:
+            if key not in layout.index:
+                record[key] = doc[key]
+        return Article._from_record(record, page=self)
+
+    def _replace(self, articles):
+        self._built = articles
+        self._n_built = len(articles)
+        self._docs = None
+
+
+class _PagedArticles(_ArticleSequence):
+    """
+    The articles of a SearchQuery, kept as the sequences of articles of each
+    page so that lazily built pages stay lazy
+    """
+
+    def __init__(self):
+        self._pages = []
+        self._offsets = []  # index of the first article of each page
+        self._head = 0  # articles dropped from the front of the first page
+        self._len = 0
+        self._appended = None  # the page that append() adds to
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError("article index out of range")
+        i += self._head
+        page = bisect.bisect_right(self._offsets, i) - 1
+        return self._pages[page][i - self._offsets[page]]
+
+    def extend(self, articles):
+        if not isinstance(articles, Sequence):
+            articles = list(articles)
+        if not len(articles):
+            return
+        end = self._offsets[-1] + len(self._pages[-1]) if self._pages else 0
+        self._pages.append(articles)
+        self._offsets.append(end)
+        self._len += len(articles)
+
+    def append(self, article):
+        # appended articles share a page rather than each getting their own
+        if self._pages and self._pages[-1] is self._appended:
+            self._appended.append(article)
+            self._len += 1
+        else:
+            self._appended = [article]
+            self.extend(self._appended)
+
+    def __delitem__(self, i):
+        # only dropping articles from the front is supported
+        if not isinstance(i, slice) or i.start not in (None, 0) or \
+                i.step not in (None, 1):
+            raise TypeError("only slices from the start can be deleted")
+        n = min(len(range(*i.indices(self._len))), self._len)
+        self._head += n
+        self._len -= n
+        # forget pages that have been dropped completely
+        while len(self._pages) > 1 and self._offsets[1] <= self._head:
+            shift = self._offsets[1]
+            self._pages.pop(0)
+            self._offsets = [o - shift for o in self._offsets[1:]]
+            self._head -= shift
+        if self._pages and self._head >= len(self._pages[0]):
+            self._pages, self._offsets, self._head = [], [], 0
+
+    def _replace(self, articles):
+        self._pages, self._offsets, self._head = [], [], 0
+        self._len = 0
+        self._appended = None
+        self.extend(articles)
+
+
 class SolrResponse(APIResponse):
     """
     Base class for storing a solr response
@@ -315,9 +784,39 @@ class SolrResponse(APIResponse):
         :param http_response: complete json response from solr
         :type http_response: request.response
         """
-        self._raw = http_response.text
-        self.json = http_response.json()
+        self._raw = self._raw_text(http_response)
+        self.json = self._decode_json(http_response)
         self._articles = None
+        self._facets = None
+        self._stats = None
+        self._parse_header()
+        self.n_docs = len(self.docs)
+
+    @classmethod
+    def _from_json(cls, json):
+        """
+        Build a SolrResponse from an already decoded solr response
+        :type json: dict
+        """
+        response = cls.__new__(cls)
+        response._raw = None
+        response.json = json
+        response._articles = None
+        response._facets = None
+        response._stats = None
+        response._parse_header()
+        response.n_docs = len(response.docs)
+        return response
+
+    def __reduce__(self):
+        # The decoded json is all that is needed; the http response, raw text
+        # and built articles are left behind
+        return _solr_response_from_json, (self.json,)
+
+    def _parse_header(self):
+        """
+        Set the header fields, numFound and docs from self.json
+        """
         try:
             self.responseHeader = self.json['responseHeader']
             self.params = self.json['responseHeader']['params']
@@ -330,22 +829,104 @@ class SolrResponse(APIResponse):
         except KeyError as e:
             raise SolrResponseParseError("{}".format(e))
 
+    @property
+    def facets(self):
+        """
+        The parsed facet counts, or None if no facets were requested
+        """
+        if self._facets is None and "facet_counts" in self.json:
+            self._facets = FacetResult(self.json["facet_counts"])
+        return self._facets
+
+    @property
+    def stats(self):
+        """
+        The parsed stats component, or None if no stats were requested
+        """
+        if self._stats is None and "stats" in self.json:
+            self._stats = StatsResult(self.json["stats"])
+        return self._stats
+
+    def result_set(self, typed=False):
+        """
+        Return the docs of this response as a columnar ResultSet
+        :param typed: convert the columns to their types in ads.schema
+        """
+        return ResultSet.from_docs(self.docs, fields=self.fl or None,
+                                   typed=typed)
+
     @property
     def articles(self):
         """
-        articles getter
+        articles getter. Each Article is only built when it is first
+        accessed.
         """
         if self._articles is None:
-            self._articles = []
-            for doc in self.docs:
-                # ensure all fields in the "fl" are in the doc to address
-                # issue #38
-                for k in set(self.fl).difference(doc.keys()):
-                    doc[k] = None
-                self._articles.append(Article(**doc))
+            self._articles = _LazyArticles(self.docs, self.fl)
         return self._articles
 
 
+def _solr_response_from_json(json):
+    """
+    Unpickle a SolrResponse
+    """
+    return SolrResponse._from_json(json)
+
+
+class StreamingSolrResponse(SolrResponse):
+    """
+    A solr response whose docs are parsed one at a time as the body arrives,
+    so that only about one doc is held in memory however large the page.
+    The header and numFound are available once it is built; the rest of the
+    response (e.g. nextCursorMark, highlighting) once iter_docs has been
+    exhausted. The docs are not kept, so .docs and .articles stay empty.
+    Requires ijson.
+    """
+
+    DOCS = "response.docs"
+    DOC = "response.docs.item"
+
+    def __init__(self, http_response):
+        """
+        :param http_response: a response requested with stream=True
+        :type http_response: request.response
+        """
+        _require_ijson()
+        self._raw = None
+        self._articles = None
+        self._facets = None
+        self._stats = None
+        http_response.raw.decode_content = True
+        self._events = ijson.parse(http_response.raw, use_float=True)
+        self._builder = ObjectBuilder()
+        # solr writes the header and numFound ahead of the docs
+        for prefix, event, value in self._events:
+            self._builder.event(event, value)
+            if prefix == self.DOCS and event == "start_array":
+                break
+        self.json = getattr(self._builder, "value", {})
+        self._parse_header()
+        self.n_docs = 0
+
+    def iter_docs(self):
+        """
+        Yield each doc as soon as it has been parsed, then parse the rest of
+        the response
+        """
+        builder = None
+        for prefix, event, value in self._events:
+            if prefix != self.DOC and not prefix.startswith(self.DOC + "."):
+                self._builder.event(event, value)
+                continue
+            if builder is None:
+                builder = ObjectBuilder()
+            builder.event(event, value)
+            if prefix == self.DOC and event == "end_map":
+                self.n_docs += 1
+                yield builder.value
+                builder = None
+
+
 class SearchQuery(BaseQuery):
     """
     Represents a query to apache solr
@@ -354,10 +935,17 @@ class SearchQuery(BaseQuery):
     DEFAULT_FIELDS = ["author", "first_author", "bibcode", "id", "year",
                       "title"]
     HIGHLIGHT_FIELDS = ["abstract", "title", "body", "ack", "aff", "author"]
+    INTERN_FIELDS = ["author", "first_author", "pub", "bibstem", "database",
+                     "doctype", "property"]
 
     def __init__(self, query_dict=None, q=None, fq=None, fl=DEFAULT_FIELDS,
                  sort=None, cursorMark=None, start=None, rows=50, max_pages=1,
-                 token=None, hl=None, **kwargs):
+                 token=None, hl=None, prefetch=0, stream=False,
+                 checkpoint=None, checkpoint_every=1, adaptive_rows=None,
+                 facet_field=None, facet_range=None, facet_pivot=None,
+                 facet_limit=None, facet_mincount=None, stats_field=None,
+                 stats_percentiles=None, intern_fields=None,
+                 **kwargs):
         """
         The constructor is designed to set valid and useful
         query params with potentially sparsely/selectively defined arguments
@@ -371,24 +959,72 @@ class SearchQuery(BaseQuery):
         :param sort: solr "sort" param (sort)
         :param cursorMark: solr "cursorMark" param
         :param start: solr "start" param (start) (discouraged; use cursorMark)
-        :param rows: solr "rows" param (rows)
+        :param rows: solr "rows" param (rows); 0 to only fetch numFound and
+            any facets
         :param max_pages: Maximum number of pages to return. This value may
             be modified after instantiation to increase the number of results
         :param token: optional API token to use for this searchquery
         :param hl: specify the type of highlights to return, 
                    ['abstract', 'title', 'body']
+        :param prefetch: number of pages to fetch ahead of the consumer on
+            a background thread; 0 (default) disables prefetching
+        :param stream: if True, articles are dropped once they have been
+            iterated over so that memory use does not grow with the number
+            of results; .articles then only holds the unconsumed articles
+        :param checkpoint: an ads.checkpoint.Checkpoint, or the path of a json
+            file, that the query state is saved to as pages are consumed.
+            Use SearchQuery.resume() to continue from a saved state.
+        :param checkpoint_every: save the query state every this many pages
+        :param adaptive_rows: an AdaptiveRows instance, or True for the
+            defaults, that re-tunes "rows" between pages from the observed
+            latency and response size. max_pages then counts pages fetched
+            rather than multiples of rows.
+        :param facet_field: field, or list of fields, to facet on
+        :param facet_range: dict, or list of dicts, with the keys "field",
+            "start", "end" and "gap" of ranges to facet on
+        :param facet_pivot: comma separated fields, or a list of fields, or
+            a list of either, to pivot facet on
+        :param facet_limit: solr "facet.limit" param
+        :param facet_mincount: solr "facet.mincount" param
+        :param stats_field: numeric field, or list of fields, to compute
+            sum/min/max/mean/stddev for on the server
+        :param stats_percentiles: percentiles to compute for stats_field,
+            e.g. [50, 90]
+        :param intern_fields: fields whose string values are interned in a
+            table shared by every page of this query, e.g. INTERN_FIELDS, so
+            that repeated values such as author names are only held in memory
+            once. The table keeps every distinct value for as long as the
+            query exists, so it grows with the results even when streaming.
+            Off by default.
         :param kwargs: kwargs to add to `q` as "key:value"
         """
-        self._articles = []
+        self._articles = _PagedArticles()
         self._highlights = {}
         self.response = None  # current SolrResponse object
         self.max_pages = max_pages
+        self.prefetch = int(prefetch)
+        self._prefetcher = None
+        self.stream = stream
         self.__iter_counter = 0  # Counter for our custom iterator method
+        self._n_fetched = 0  # Number of articles fetched so far
+        self._n_dropped = 0  # Number of consumed articles dropped when streaming
+        if isinstance(checkpoint, six.string_types):
+            checkpoint = FileCheckpoint(checkpoint)
+        self.checkpoint = checkpoint
+        self.checkpoint_every = checkpoint_every
+        self._n_pages = 0  # Number of pages loaded so far
+        if adaptive_rows is True:
+            adaptive_rows = AdaptiveRows()
+        self.adaptive_rows = adaptive_rows or None
+        self._interner = _Interner(intern_fields) if intern_fields else None
 
         if query_dict is not None:
             query_dict.setdefault('rows', 50)
-            query_dict.setdefault('cursorMark', '*')
-            query_dict.setdefault('sort', 'score desc,id desc')
+            if query_dict.get('start') is None:
+                query_dict.setdefault('cursorMark', '*')
+                query_dict.setdefault('sort', 'score desc,id desc')
+            else:
+                query_dict.setdefault('sort', 'score desc')
             self._query = query_dict
         else:
             if start is None and cursorMark is None:
@@ -451,7 +1087,18 @@ class SearchQuery(BaseQuery):
                         value = u'"{}"'.format(value)
                     self._query['q'] += u' {}:{}'.format(field, value)
 
-        assert self._query.get('rows') > 0, "rows must be greater than 0"
+            self._query.update(facet_params(
+                field=facet_field, range=facet_range, pivot=facet_pivot,
+                limit=facet_limit, mincount=facet_mincount
+            ))
+            self._query.update(stats_params(
+                field=stats_field, percentiles=stats_percentiles
+            ))
+
+        assert self.prefetch >= 0, "prefetch must not be negative"
+        assert self.checkpoint_every > 0, \
+            "checkpoint_every must be greater than 0"
+        assert self._query.get('rows') >= 0, "rows must not be negative"
         assert self._query.get('q'), "q must not be empty"
         assert self._query.get('cursorMark') is None or \
             self._query.get('start') is None, \
@@ -460,11 +1107,46 @@ class SearchQuery(BaseQuery):
         if token is not None:
             self.token = token
 
+    @classmethod
+    def resume(cls, checkpoint, **kwargs):
+        """
+        Continue a query from the state saved in `checkpoint`. The first page
+        fetched is the one that follows the last article the original query
+        handed out.
+        :param checkpoint: an ads.checkpoint.Checkpoint or the path of a json
+            checkpoint file
+        :param kwargs: keyword arguments passed on to the constructor, e.g.
+            token or stream. max_pages defaults to the saved value.
+        """
+        if isinstance(checkpoint, six.string_types):
+            checkpoint = FileCheckpoint(checkpoint)
+        state = checkpoint.load()
+        assert state is not None, "no saved state found in checkpoint"
+        kwargs.setdefault("max_pages", state["max_pages"])
+        sq = cls(query_dict=state["query"], checkpoint=checkpoint, **kwargs)
+        sq._n_fetched = sq._n_dropped = state["fetched"]
+        sq._n_pages = state.get("pages", 0)
+        sq.__iter_counter = state["fetched"]
+        return sq
+
+    def save_checkpoint(self):
+        """
+        Save the query dict, including the cursorMark or start of the next
+        page, and the number of articles handed out so far
+        """
+        self.checkpoint.save({
+            "query": self._query,
+            "fetched": self._n_fetched,
+            "pages": self._n_pages,
+            "max_pages": self.max_pages,
+        })
+
     @property
     def articles(self):
         """
         Read-only articles attribute should not be modified directly, as
-        it is used to gauge the progress of the query
+        it is used to gauge the progress of the query. When streaming, only
+        the articles that have not been iterated over yet are kept.
         """
         return self._articles
 
@@ -477,7 +1159,7 @@ class SearchQuery(BaseQuery):
         """
         if self.response is None:
             return "Query has not been executed"
-        return "{}/{}".format(len(self.articles), self.response.numFound)
+        return "{}/{}".format(self._n_fetched, self.response.numFound)
 
     @property
     def query(self):
@@ -496,6 +1178,100 @@ class SearchQuery(BaseQuery):
         """
         return self._highlights.get(article.id, {})
 
+    @property
+    def facets(self):
+        """
+        The FacetResult of the query, which is the same for every page.
+        Executes the query if it has not been executed yet.
+        """
+        if self.response is None:
+            self.execute()
+        return self.response.facets
+
+    @property
+    def stats(self):
+        """
+        The StatsResult of the query, which is the same for every page.
+        Executes the query if it has not been executed yet.
+        """
+        if self.response is None:
+            self.execute()
+        return self.response.stats
+
+    def hydrate(self, fields, chunk_size=100):
+        """
+        Load `fields` for all of the articles fetched so far with as few
+        requests as possible, and ask for them in every later page
+        :param fields: solr fields to load
+        :type fields: list or string
+        :param chunk_size: number of articles per request
+        """
+        if isinstance(fields, six.string_types):
+            fields = [fields]
+        _hydrate(self.articles, fields, chunk_size=chunk_size,
+                 token=self._token)
+        if isinstance(self._query.get("fl"), list):
+            self._query["fl"].extend(
+                f for f in fields
+                if f not in self._query["fl"] and f not in _NON_SOLR_FIELDS
+            )
+
+    def count(self):
+        """
+        Return the number of records matching the query, from a single
+        request that does not return any documents
+        """
+        return self._fetch(self._count_params()).numFound
+
+    def count_many(self, queries, max_url_length=MAX_URL_LENGTH):
+        """
+        Count the records matching each of `queries` within the results of
+        this query. The queries are sent as solr "facet.query" params, as
+        many per request as fit in a URL of `max_url_length`, so that many
+        counts cost a single request.
+        :param queries: solr queries to count, e.g.
+            ['bibstem:ApJ year:2000', 'bibstem:ApJ year:2001']
+        :type queries: list
+        :param max_url_length: maximum length of the URL of every request;
+            a query that does not fit with any other is sent on its own
+        :return: list of counts, in the same order as `queries`
+        """
+        params = self._count_params()
+        params["facet"] = "true"
+        base = _url_length(params)
+        chunks, length = [], max_url_length
+        for query in OrderedDict.fromkeys(queries):
+            added = len("&facet.query=") + _encoded_length(query)
+            if length + added > max_url_length:
+                chunks.append([])
+                length = base
+            chunks[-1].append(query)
+            length += added
+
+        counts = {}
+        for chunk in chunks:
+            response = self._fetch(dict(params, **{"facet.query": chunk}))
+            facet_queries = response.json.get("facet_counts", {})\
+                .get("facet_queries", {})
+            for query in chunk:
+                if query not in facet_queries:
+                    raise SolrResponseParseError(
+                        "No count returned for facet.query {}".format(query))
+                counts[query] = facet_queries[query]
+        return [counts[query] for query in queries]
+
+    def _count_params(self):
+        """
+        Query params that return only numFound for this query
+        """
+        params = dict(
+            (k, v) for k, v in six.iteritems(self._query)
+            if k not in ("cursorMark", "start", "sort", "hl", "hl.fl")
+            and not k.startswith(("facet", "f.", "stats"))
+        )
+        params.update({"fl": "id", "rows": 0})
+        return params
+
     def __iter__(self):
         return self
 
@@ -509,27 +1285,35 @@ class SearchQuery(BaseQuery):
         # Allow immediate iteration without forcing a user to call .execute()
         # explicitly
         if self.response is None:
+            if self._resumed_at_max_pages():
+                raise StopIteration("Maximum number of pages queried")
             self.execute()
 
         try:
-            cur = self._articles[self.__iter_counter]
+            cur = self._articles[self.__iter_counter - self._n_dropped]
             # If no more articles, check to see if we should query for the
             # next page of results
         except IndexError:
             # If we already have all the results, then iteration is done.
-            if len(self.articles) >= self.response.numFound:
+            if self._n_fetched >= self.response.numFound or \
+                    not self.query['rows']:
+                if self.checkpoint is not None:
+                    self.save_checkpoint()
                 raise StopIteration("All records found")
 
             # if we have hit the max_pages limit, then iteration is done.
-            page = math.ceil(len(self.articles)/self.query['rows'])
+            page = self._pages_done(self._n_fetched, self._n_pages,
+                                    self.query['rows'])
             if page >= self.max_pages:
+                if self.checkpoint is not None:
+                    self.save_checkpoint()
                 raise StopIteration("Maximum number of pages queried")
 
             # We aren't on the max_page of results nor do we have all
             # results: execute the next query and yield from the newly
             # extended .articles array.
             self.execute()
-            cur = self._articles[self.__iter_counter]
+            cur = self._articles[self.__iter_counter - self._n_dropped]
 
         self.__iter_counter += 1
         return cur
@@ -540,28 +1324,690 @@ class SearchQuery(BaseQuery):
         In addition, set up the request such that we can call next()
         to provide the next page of results
         """
-        self.response = SolrResponse.load_http_response(
-            self.session.get(self.HTTP_ENDPOINT, params=self.query)
+        self._load_response(self._next_response())
+
+    def iter_pages(self):
+        """
+        Yield the SolrResponse of each page that has not been fetched yet,
+        up to max_pages, without building Article objects for them. Meant
+        for bulk consumers of the raw docs; it does not add to .articles,
+        so don't mix it with iterating over the query.
+        """
+        while (self.response is None and
+               not self._resumed_at_max_pages()) or \
+                (self.response is not None and self._has_more_pages()):
+            response = self._next_response()
+            self._load_response(response, articles=False)
+            yield response
+        # like __next__ at StopIteration, save the state after the last page
+        if self.checkpoint is not None:
+            self.save_checkpoint()
+
+    def result_set(self, typed=False):
+        """
+        Fetch the remaining pages, up to max_pages, straight into a columnar
+        ResultSet without building Article objects. Requires numpy.
+        :param typed: convert the columns to their types in ads.schema, e.g.
+            pubdate to datetime64, one page at a time
+        """
+        return ResultSet.concat(
+            ResultSet.from_docs(response.docs, fields=self._fields(),
+                                typed=typed)
+            for response in self.iter_pages()
+        )
+
+    def iter_record_batches(self, schema=None):
+        """
+        Yield one Arrow record batch per remaining page, up to max_pages,
+        built straight from the docs without building Article objects. The
+        columns are the fields in "fl", typed as in ads.schema, with list
+        columns for multi-valued fields such as author. Requires pyarrow.
+        :param schema: Arrow schema for the batches; by default
+            ads.arrow.arrow_schema() of the fields, in which fields without
+            a type in ads.schema are strings, with values that are not
+            strings kept as JSON
+        :type schema: pyarrow.Schema
+        """
+        fields = self._fields()
+        if schema is None:
+            schema = arrow.arrow_schema(fields)
+        for response in self.iter_pages():
+            yield arrow.record_batch(response.docs, fields, schema=schema)
+
+    def to_arrow(self, schema=None):
+        """
+        Fetch the remaining pages, up to max_pages, into an Arrow table.
+        Requires pyarrow.
+        :param schema: see iter_record_batches
+        """
+        arrow._require_pyarrow()
+        batches = list(self.iter_record_batches(schema=schema))
+        if not batches:
+            return arrow.pa.Table.from_batches(
+                [], schema=schema or arrow.arrow_schema(self._fields()))
+        return arrow.pa.Table.from_batches(batches)
+
+    def to_pandas(self, schema=None, **kwargs):
+        """
+        Fetch the remaining pages, up to max_pages, into a pandas DataFrame.
+        Requires pyarrow and pandas.
+        :param schema: see iter_record_batches
+        :param kwargs: kwargs passed on to pyarrow.Table.to_pandas
+        """
+        return self.to_arrow(schema=schema).to_pandas(**kwargs)
+
+    def _fields(self):
+        """
+        The fields in "fl", as a list
+        """
+        fields = self._query.get("fl")
+        if isinstance(fields, six.string_types):
+            fields = [f.strip() for f in fields.split(",")]
+        return fields
+
+    def iter_docs(self):
+        """
+        Yield the solr docs of the remaining pages, up to max_pages, one at a
+        time as they are parsed from the response body. Only about one doc
+        is held in memory at once, which keeps pages with large fields such
+        as `body` cheap. Requires ijson. Like iter_pages, it does not add to
+        .articles, and prefetching is not used.
+        """
+        _require_ijson()
+        while (self.response is None and
+               not self._resumed_at_max_pages()) or \
+                (self.response is not None and self._has_more_pages()):
+            response = self._next_response(streaming=True)
+            for doc in response.iter_docs():
+                if self._interner is not None:
+                    self._interner(doc)
+                yield doc
+            self._load_response(response, articles=False)
+        if self.checkpoint is not None:
+            self.save_checkpoint()
+
+    def _resumed_at_max_pages(self):
+        """
+        Whether a resumed query that has not fetched a page yet had already
+        reached max_pages when its state was saved
+        """
+        if not self._n_fetched:
+            return False
+        page = self._pages_done(self._n_fetched, self._n_pages,
+                                self.query['rows'])
+        return page >= self.max_pages
+
+    def _has_more_pages(self):
+        """
+        Whether the stopping conditions of __next__ allow another page
+        """
+        if self._n_fetched >= self.response.numFound or \
+                not self.query['rows'] or not self.response.n_docs:
+            return False
+        page = self._pages_done(self._n_fetched, self._n_pages,
+                                self.query['rows'])
+        return page < self.max_pages
+
+    def _next_response(self, streaming=False):
+        """
+        Fetch, or take from the prefetcher, the page described by self.query
+        :param streaming: fetch a StreamingSolrResponse, bypassing the
+            prefetcher
+        """
+        # By the time the next page is requested every article fetched so far
+        # has been handed out, so this is the point to save progress
+        if self.checkpoint is not None and self.response is not None and \
+                self._n_pages % self.checkpoint_every == 0:
+            self.save_checkpoint()
+        if streaming:
+            return self._fetch(self.query, streaming=True)
+        if self.prefetch:
+            return self._next_prefetched()
+        return self._fetch(self.query)
+
+    def execute_parallel(self, max_workers=4):
+        """
+        Fetch all of the remaining pages of a `start` based query, up to
+        max_pages, with a pool of threads. Once the first page has returned
+        numFound, every remaining page offset is known in advance; the pages
+        are fetched concurrently and added to .articles in order.
+        :param max_workers: maximum number of concurrent requests
+        :type max_workers: int
+        """
+        assert self._query.get('start') is not None, \
+            "parallel execution requires a start based query"
+        assert max_workers > 0, "max_workers must be greater than 0"
+        assert self.adaptive_rows is None, \
+            "parallel execution requires a fixed number of rows"
+        self.close()
+
+        # The first page tells us numFound and the rows ceiling ADS applies
+        if self.response is None:
+            self.execute()
+
+        rows = self.query['rows']
+        if not rows:
+            return
+        pages_left = self.max_pages - int(math.ceil(self._n_fetched / float(rows)))
+        offsets = list(range(self.query['start'], self.response.numFound, rows))
+        offsets = offsets[:max(pages_left, 0)]
+        if not offsets:
+            return
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self._fetch, dict(self.query, start=offset))
+                for offset in offsets
+            ]
+            for future in futures:
+                self._load_response(future.result())
+
+    def close(self):
+        """
+        Stop any background prefetching. Pages that were fetched ahead but
+        not yet consumed are discarded.
+        """
+        if self._prefetcher is not None:
+            self._prefetcher.stop()
+            self._prefetcher = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except AttributeError:
+            # __init__ failed before there was anything to close
+            pass
+
+    def _request(self, query, streaming=False):
+        """
+        Send the http request for a single page and return the response
+        :param query: query params for the page to fetch
+        :type query: dict
+        :param streaming: don't read the body before returning
+        """
+        return self.session.get(self.HTTP_ENDPOINT, params=query,
+                                stream=streaming)
+
+    def _fetch(self, query, streaming=False):
+        """
+        Send a single page request for `query` and return the SolrResponse.
+        The wall time of the request is kept as the response's `latency` and
+        the size of its body as `nbytes`.
+        :param query: query params for the page to fetch
+        :type query: dict
+        :param streaming: return a StreamingSolrResponse whose docs are read
+            as they arrive; its latency only covers the response headers
+        """
+        t0 = time.time()
+        http_response = self._request(query, streaming=streaming)
+        if streaming:
+            nbytes = None
+            response = StreamingSolrResponse.load_http_response(http_response)
+        else:
+            nbytes = len(http_response.content)
+            response = SolrResponse.load_http_response(http_response)
+        response.latency = time.time() - t0
+        response.nbytes = nbytes
+        return response
+
+    def _pages_done(self, n_fetched, n_pages, rows):
+        """
+        Number of pages counted against max_pages
+        """
+        if self.adaptive_rows is not None or not rows:
+            return n_pages
+        return math.ceil(n_fetched / float(rows))
+
+    def _tune_rows(self, query, response, ceiling=None):
+        """
+        Let the adaptive rows controller, if any, pick "rows" for the page
+        after `response`
+        :param query: query params to update
+        :type query: dict
+        :param response: the last response fetched
+        :type response: SolrResponse
+        :param ceiling: the rows ceiling applied by ADS, if it was hit
+        """
+        if self.adaptive_rows is None:
+            return
+        if ceiling is not None:
+            self.adaptive_rows.ceiling = ceiling
+        query['rows'] = self.adaptive_rows.next_rows(
+            response.n_docs or query['rows'],
+            getattr(response, "latency", None),
+            getattr(response, "nbytes", None)
         )
 
+    def _next_prefetched(self):
+        """
+        Return the next SolrResponse from the background prefetcher,
+        (re)starting it from the current query state if needed
+        """
+        while True:
+            if self._prefetcher is None:
+                self._prefetcher = _Prefetcher(self, depth=self.prefetch)
+            try:
+                response = self._prefetcher.get()
+            except Exception:
+                # The prefetcher stops on an error; calling next() again, e.g.
+                # after a rate limit, restarts it from the page that failed.
+                self._prefetcher = None
+                raise
+            if response is not None:
+                return response
+            # The prefetcher stopped at max_pages or the end of the results;
+            # an explicit execute() still fetches the next page.
+            self._prefetcher = None
+
+    def _load_response(self, response, articles=True):
+        """
+        Set `response` as the current response and advance the query to the
+        next page
+        :param response: the SolrResponse for the page described by self.query
+        :type response: SolrResponse
+        :param articles: whether to add the page's articles to .articles
+        """
+        self.response = response
+        if self._interner is not None:
+            for doc in response.docs:
+                self._interner(doc)
+
         # ADS will apply a ceiling to 'rows' and re-write the query
         # This code checks if that happened by comparing the reponse
         # "rows" with what we sent in our query
         # references https://github.com/andycasey/ads/issues/45
         recv_rows = int(self.response.responseHeader.get("params", {}).get("rows"))
+        ceiling = None
         if recv_rows != self.query.get("rows"):
+            if recv_rows < self.query.get("rows"):
+                ceiling = recv_rows
             self._query['rows'] = recv_rows
             warnings.warn("Response rows did not match input rows. "
                           "Setting this query's rows to {}".format(self.query['rows']))
 
-        self._articles.extend(self.response.articles)
-        if self._query.get('start') is not None:
-            self._query['start'] += self._query['rows']
-        elif self._query.get('cursorMark') is not None:
-            self._query['cursorMark'] = self.response.json.get("nextCursorMark")
+        if self.stream:
+            self._drop_consumed()
+        if articles:
+            self._articles.extend(self.response.articles)
+        self._n_fetched += self.response.n_docs
+        self._n_pages += 1
+        _advance_page(self._query, self.response)
+        self._tune_rows(self._query, self.response, ceiling)
 
         self._highlights.update(self.response.json.get("highlighting", {}))
 
+    def _drop_consumed(self):
+        """
+        Forget the articles (and their highlights) that have already been
+        iterated over
+        """
+        consumed = self.__iter_counter - self._n_dropped
+        for article in self._articles[:consumed]:
+            self._highlights.pop(article.id, None)
+        del self._articles[:consumed]
+        self._n_dropped += consumed
+
+
+def _advance_page(query, response):
+    """
+    Move `query` on to the page that follows `response`
+    :param query: query params that produced `response`
+    :type query: dict
+    :param response: the response for the page described by `query`
+    :type response: SolrResponse
+    """
+    if query.get('start') is not None:
+        query['start'] += query['rows']
+    elif query.get('cursorMark') is not None:
+        query['cursorMark'] = response.json.get("nextCursorMark")
+
+
+class AdaptiveRows(object):
+    """
+    Picks the number of rows for the next page of a SearchQuery so that a
+    page takes about `target_latency` seconds and/or `target_bytes` bytes.
+    The choice only depends on the last page, so the same pages are asked
+    for whether or not the query prefetches.
+    """
+
+    def __init__(self, target_latency=2.0, target_bytes=None, min_rows=10,
+                 max_rows=2000, max_growth=2.0):
+        """
+        :param target_latency: seconds a page should take, or None
+        :param target_bytes: size a page response should have, or None
+        :param min_rows: never ask for fewer rows than this
+        :param max_rows: never ask for more rows than this
+        :param max_growth: never grow rows by more than this factor per page
+        """
+        assert 0 < min_rows <= max_rows, "0 < min_rows <= max_rows must hold"
+        assert max_growth > 1, "max_growth must be greater than 1"
+        self.target_latency = target_latency
+        self.target_bytes = target_bytes
+        self.min_rows = min_rows
+        self.max_rows = max_rows
+        self.max_growth = max_growth
+        self.ceiling = None  # rows ceiling applied by ADS, once observed
+
+    def next_rows(self, rows, latency, nbytes):
+        """
+        :param rows: number of rows in the last page
+        :param latency: seconds the last page took, or None if unknown
+        :param nbytes: size of the last page response
+        :return: the number of rows to ask for next
+        """
+        scale = self.max_growth
+        if self.target_latency and latency:
+            scale = min(scale, self.target_latency / float(latency))
+        if self.target_bytes and nbytes:
+            scale = min(scale, self.target_bytes / float(nbytes))
+        upper = self.max_rows
+        if self.ceiling is not None:
+            upper = min(upper, self.ceiling)
+        return int(max(self.min_rows, min(upper, rows * scale)))
+
+
+class _Prefetcher(object):
+    """
+    Fetches the pages of a SearchQuery on a background thread, up to `depth`
+    pages ahead of the consumer. Pages are fetched one after the other, so
+    they are handed back in the same order as a serial run would see them.
+    """
+
+    def __init__(self, search_query, depth):
+        """
+        :param search_query: the query to fetch pages for; its current query
+            state is the first page that will be fetched. Only a weak
+            reference is kept, so that a query that is dropped before it is
+            exhausted can be garbage collected, which stops the thread.
+        :type search_query: SearchQuery
+        :param depth: maximum number of pages fetched but not yet consumed
+        :type depth: int
+        """
+        self._search_query = weakref.ref(search_query)
+        self._query = dict(search_query.query)
+        self._fetched = search_query._n_fetched
+        self._pages = search_query._n_pages
+        self._slots = threading.Semaphore(depth)
+        self._queue = queue.Queue()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _more_pages(self, search_query, sent, response):
+        """
+        Mirrors the stopping conditions of SearchQuery.__next__
+        """
+        if self._fetched >= response.numFound or not response.docs:
+            return False
+        # solr signals the end of a cursor by returning the cursor it was sent
+        if sent.get("cursorMark") is not None and \
+                response.json.get("nextCursorMark") == sent["cursorMark"]:
+            return False
+        page = search_query._pages_done(
+            self._fetched, self._pages, self._query['rows'])
+        return page < search_query.max_pages
+
+    def _run(self):
+        try:
+            while True:
+                # blocks until a page is consumed or stop() is called
+                self._slots.acquire()
+                if self._stopped.is_set():
+                    return
+                search_query = self._search_query()
+                if search_query is None:
+                    return
+                more = self._fetch_page(search_query)
+                # don't keep the query alive while waiting for a slot
+                del search_query
+                if not more:
+                    break
+        except Exception as e:
+            self._queue.put(e)
+            return
+        self._queue.put(None)
+
+    def _fetch_page(self, search_query):
+        """
+        Fetch the next page onto the queue
+        :return: whether there are more pages to fetch
+        """
+        sent = dict(self._query)
+        response = search_query._fetch(sent)
+        recv_rows = response.responseHeader.get("params", {}).get("rows")
+        ceiling = None
+        if recv_rows is not None:
+            if int(recv_rows) < sent['rows']:
+                ceiling = int(recv_rows)
+            self._query['rows'] = int(recv_rows)
+        self._fetched += len(response.docs)
+        self._pages += 1
+        _advance_page(self._query, response)
+        search_query._tune_rows(self._query, response, ceiling)
+        self._queue.put(response)
+        return self._more_pages(search_query, sent, response)
+
+    def get(self):
+        """
+        Return the next fetched SolrResponse, or None once the prefetcher
+        has stopped. Exceptions raised while fetching are re-raised here.
+        """
+        item = self._queue.get()
+        self._slots.release()
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    def stop(self):
+        self._stopped.set()
+        # wake the thread up if it is waiting for a slot
+        self._slots.release()
+
+
+class ShardedSearchQuery(SearchQuery):
+    """
+    Splits one logical query into disjoint "fq" slices that are paginated
+    concurrently, each with its own cursor, and merged back into the
+    requested sort order.
+    """
+
+    def __init__(self, shards, *args, **kwargs):
+        """
+        :param shards: filter queries that partition the results of the
+            query, e.g. from range_shards() or prefix_shards(). The slices
+            must be disjoint or records will be returned more than once.
+        :type shards: list
+        :param args: args passed on to SearchQuery
+        :param kwargs: kwargs passed on to SearchQuery. max_pages applies
+            to each shard. prefetch defaults to 1 so that every shard fetches
+            its pages on its own background thread. checkpoint is not
+            supported.
+        """
+        if kwargs.get('checkpoint') is not None:
+            raise TypeError("{} does not support checkpoint".format(
+                type(self).__name__))
+        kwargs.setdefault('prefetch', 1)
+        super(ShardedSearchQuery, self).__init__(*args, **kwargs)
+        self._merged = None
+        self._sort_spec = _parse_sort(self._query['sort'])
+
+        # Every field in the sort has to come back in the docs to be merged
+        fl = self._query['fl']
+        if isinstance(fl, six.string_types):
+            fl = [f.strip() for f in fl.split(",")]
+        fl = list(fl)
+        fl += [f for f, _ in self._sort_spec if f not in fl]
+
+        self.shards = []
+        for query_dict in self._shard_queries(shards, fl):
+            sq = SearchQuery(query_dict=query_dict, max_pages=self.max_pages,
+                             prefetch=self.prefetch, stream=self.stream,
+                             adaptive_rows=self.adaptive_rows)
+            sq._token = self._token
+            sq._interner = self._interner
+            self.shards.append(sq)
+
+    def _shard_queries(self, shards, fl):
+        """
+        The query dicts of the shards: this query with each shard added to
+        its "fq"
+        :param fl: the fields to ask every shard for
+        """
+        assert shards, "shards must not be empty"
+        base_fq = self._query.get('fq') or []
+        if isinstance(base_fq, six.string_types):
+            base_fq = [base_fq]
+        return [dict(self._query, fq=list(base_fq) + [shard], fl=fl)
+                for shard in shards]
+
+    @property
+    def progress(self):
+        """
+        Returns a string representation of the progress of the search, summed
+        over all of the shards
+        """
+        if self._merged is None:
+            return "Query has not been executed"
+        return "{}/{}".format(
+            self._n_fetched,
+            sum(sq.response.numFound for sq in self.shards
+                if sq.response is not None)
+        )
+
+    def highlights(self, article):
+        """
+        Return highlights for a given article
+        :param article: ads.Article
+        :return: list
+        """
+        for sq in self.shards:
+            if article.id in sq._highlights:
+                return sq._highlights[article.id]
+        return {}
+
+    def __next__(self):
+        if self._merged is None:
+            self.execute()
+        try:
+            cur = next(self._merged)
+        except StopIteration:
+            raise StopIteration("All records found")
+        self._n_fetched += 1
+        if not self.stream:
+            self._articles.append(cur)
+        return cur
+
+    def execute(self):
+        """
+        Start fetching every shard in the background and set up the merge
+        of their results
+        """
+        if self._merged is not None:
+            return
+        for sq in self.shards:
+            sq.max_pages = self.max_pages
+            if sq.prefetch and sq._prefetcher is None:
+                sq._prefetcher = _Prefetcher(sq, depth=sq.prefetch)
+        self._merged = self._merge()
+
+    def close(self):
+        for sq in self.shards:
+            sq.close()
+
+    def _merge(self):
+        """
+        k-way merge of the shards' articles into the requested sort order
+        """
+        heap = []
+        iterators = [iter(sq) for sq in self.shards]
+
+        def push(i):
+            for article in iterators[i]:
+                key = _SortKey(
+                    [article._raw.get(f) for f, _ in self._sort_spec],
+                    self._sort_spec
+                )
+                heapq.heappush(heap, (key, i, article))
+                return
+
+        for i in range(len(self.shards)):
+            push(i)
+        while heap:
+            _, i, article = heapq.heappop(heap)
+            yield article
+            push(i)
+
+
+class _SortKey(object):
+    """
+    Orders field values the way solr does for a given sort spec. Records
+    that are missing a value sort last.
+    """
+    __slots__ = ("values", "spec")
+
+    def __init__(self, values, spec):
+        self.values = values
+        self.spec = spec
+
+    def __lt__(self, other):
+        for a, b, (_, descending) in zip(self.values, other.values, self.spec):
+            if a == b:
+                continue
+            if a is None or b is None:
+                return b is None
+            return a > b if descending else a < b
+        return False
+
+
+def _parse_sort(sort):
+    """
+    Parse a solr sort string such as "citation_count desc,id desc" into a
+    list of (field, descending) tuples
+    """
+    spec = []
+    for clause in sort.split(","):
+        parts = clause.strip().split()
+        if not parts:
+            continue
+        descending = len(parts) > 1 and parts[1].lower() == "desc"
+        spec.append((parts[0], descending))
+    return spec
+
+
+def range_shards(field, edges):
+    """
+    Build filter queries that partition `field` into consecutive ranges.
+    Each range includes its lower edge and excludes its upper one, apart from
+    the last which includes both.
+    :param field: the field to shard on, e.g. "year" or "pubdate"
+    :param edges: sorted range edges, e.g. [2000, 2005, 2010]
+    :return: list of filter queries
+    """
+    assert len(edges) > 1, "at least two edges are needed"
+    shards = []
+    for i, (lo, hi) in enumerate(zip(edges[:-1], edges[1:])):
+        close = "]" if i == len(edges) - 2 else "}"
+        shards.append("{}:[{} TO {}{}".format(field, lo, hi, close))
+    return shards
+
+
+def prefix_shards(field, prefixes):
+    """
+    Build filter queries that select records by the prefix of `field`, e.g.
+    bibcode prefixes ["1990", "1991", ...]
+    :param field: the field to shard on, e.g. "bibcode"
+    :param prefixes: prefixes, none of which should be a prefix of another
+    :return: list of filter queries
+    """
+    return ["{}:{}*".format(field, prefix) for prefix in prefixes]
+
 
 class query(SearchQuery):
     """
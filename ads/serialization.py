@@ -0,0 +1,75 @@
+"""
+Compact binary encoding of lists of Articles, e.g. to ship harvested records
+between processes or into a cache
+"""
+
+from .search import Article, _Layout, _Record, _MISSING
+
+try:
+    import msgpack
+except ImportError:  # msgpack is an optional dependency
+    msgpack = None
+
+
+# msgpack extension type code for a field without a value
+_MISSING_EXT = 0
+
+
+def _require_msgpack():
+    if msgpack is None:
+        raise ImportError("article encoding requires msgpack: "
+                          "pip install msgpack")
+
+
+def _default(obj):
+    if obj is _MISSING:
+        return msgpack.ExtType(_MISSING_EXT, b"")
+    raise TypeError("Cannot encode {!r}".format(obj))
+
+
+def _ext_hook(code, data):
+    if code == _MISSING_EXT:
+        return _MISSING
+    return msgpack.ExtType(code, data)
+
+
+def dumps_articles(articles):
+    """
+    Encode articles with msgpack. Only their field data is stored: the field
+    names once, then one row of values per article. Requires msgpack.
+    :param articles: the articles to encode
+    :type articles: list of Article
+    :rtype: bytes
+    """
+    _require_msgpack()
+    articles = list(articles)
+    layout = _Layout()
+    for article in articles:
+        for name in article._raw:
+            layout.add(name)
+    rows = [
+        [article._raw.get(name, _MISSING) for name in layout.names]
+        for article in articles
+    ]
+    return msgpack.packb([layout.names, rows], default=_default,
+                         use_bin_type=True)
+
+
+def loads_articles(data, cls=Article):
+    """
+    Decode articles encoded by dumps_articles. The articles share one field
+    layout, and fields that were never loaded are still loaded on access, for
+    all of the decoded articles at once. Requires msgpack.
+    :param data: the encoded articles
+    :type data: bytes
+    :param cls: the Article class to build
+    :rtype: list of Article
+    """
+    _require_msgpack()
+    names, rows = msgpack.unpackb(data, ext_hook=_ext_hook, raw=False)
+    layout = _Layout(names)
+    articles = []
+    for values in rows:
+        articles.append(cls._from_record(_Record(layout, values),
+                                         page=articles))
+    return articles
@@ -0,0 +1,87 @@
+"""
+Typed representations of the solr stats component
+"""
+
+import six
+
+
+class FieldStats(object):
+    """
+    Statistics of a single numeric field over the results of a query
+    """
+
+    def __init__(self, field, data):
+        """
+        :param field: the field the statistics were computed for
+        :param data: the field's entry in stats.stats_fields
+        :type data: dict
+        """
+        self.field = field
+        self.min = data.get("min")
+        self.max = data.get("max")
+        self.sum = data.get("sum")
+        self.mean = data.get("mean")
+        self.stddev = data.get("stddev")
+        self.count = data.get("count")
+        self.missing = data.get("missing")
+        percentiles = data.get("percentiles") or {}
+        if isinstance(percentiles, list):
+            # solr's flat [percentile, value, ...] representation
+            percentiles = zip(percentiles[::2], percentiles[1::2])
+        else:
+            percentiles = six.iteritems(percentiles)
+        self.percentiles = dict(
+            (float(p), value) for p, value in percentiles
+        )
+
+    def __repr__(self):
+        return "<FieldStats {} count={} sum={} mean={}>".format(
+            self.field, self.count, self.sum, self.mean)
+
+
+class StatsResult(object):
+    """
+    The stats component section of a solr response
+    """
+
+    def __init__(self, stats):
+        """
+        :param stats: the "stats" section of a solr response
+        :type stats: dict
+        """
+        self._raw = stats
+        self.fields = dict(
+            (field, FieldStats(field, data or {})) for field, data in
+            six.iteritems(stats.get("stats_fields", {}))
+        )
+
+    def __getitem__(self, field):
+        return self.fields[field]
+
+    def __repr__(self):
+        return "<StatsResult {}>".format(sorted(self.fields))
+
+
+# Statistics that are requested alongside percentiles; solr only computes the
+# statistics named in the local params once any of them is given
+_DEFAULT_STATS = ("min", "max", "sum", "mean", "stddev", "count", "missing")
+
+
+def stats_params(field=None, percentiles=None):
+    """
+    Build the solr params for the stats component
+    :param field: numeric field, or list of fields, e.g. "citation_count"
+    :param percentiles: percentiles to compute for every field, e.g. [50, 90]
+    :return: dict of params, empty if no stats were requested
+    """
+    if field is None:
+        return {}
+    fields = [field] if isinstance(field, six.string_types) else list(field)
+    if percentiles:
+        local_params = " ".join(
+            "{}=true".format(stat) for stat in _DEFAULT_STATS
+        )
+        local_params += " percentiles='{}'".format(
+            ",".join(str(p) for p in percentiles))
+        fields = ["{{!{}}}{}".format(local_params, f) for f in fields]
+    return {"stats": "true", "stats.field": fields}
@@ -87,6 +87,7 @@ class MockSolrResponse(HTTPrettyMock):
             """
 
             resp = json.loads(example_solr_response)
+            all_docs = resp['response']['docs']
 
             # Mimic the start, rows behaviour
             rows = int(
@@ -110,6 +111,27 @@ class MockSolrResponse(HTTPrettyMock):
             ]
             resp['responseHeader']['params']['fl'] = fl
 
+            # Mimic facet.query counts for simple "field:value" queries
+            if request.querystring.get('facet.query'):
+                resp['facet_counts'] = {'facet_queries': dict(
+                    (fq, _count_matches(all_docs, fq))
+                    for fq in request.querystring['facet.query']
+                )}
+
+            # Mimic facet.field counts
+            if request.querystring.get('facet.field'):
+                resp.setdefault('facet_counts', {})['facet_fields'] = dict(
+                    (field, _field_counts(all_docs, field))
+                    for field in request.querystring['facet.field']
+                )
+
+            # Mimic the stats component for numeric fields
+            if request.querystring.get('stats.field'):
+                resp['stats'] = {'stats_fields': dict(
+                    _field_stats(all_docs, field.split('}')[-1])
+                    for field in request.querystring['stats.field']
+                )}
+
             # Mimic cursor behavior if specified
             if request.querystring.get('cursorMark'):
                 resp['nextCursorMark'] = "AoIH///3RmWrhAAjMTY0"
@@ -124,6 +146,116 @@ class MockSolrResponse(HTTPrettyMock):
         )
 
 
+class MockBigQueryResponse(HTTPrettyMock):
+    """
+    context manager that mocks the bigquery service: the records of the
+    POSTed bibcodes, matched on bibcode or alternate_bibcode
+    """
+    def __init__(self, api_endpoint):
+        """
+        :param api_endpoint: name of the API end point
+        """
+        self.api_endpoint = api_endpoint
+        self.requests = []  # bibcodes posted by each request
+
+        def request_callback(request, uri, headers):
+            body = request.body
+            if isinstance(body, bytes):
+                body = body.decode("utf-8")
+            bibcodes = body.split("\n")[1:]
+            self.requests.append(bibcodes)
+
+            resp = json.loads(example_solr_response)
+            wanted = set(bibcodes)
+            docs = [
+                doc for doc in resp['response']['docs']
+                if doc['bibcode'] in wanted or
+                wanted.intersection(doc.get('alternate_bibcode', []))
+            ]
+            resp['response']['numFound'] = len(docs)
+
+            rows = int(request.querystring.get('rows', [10])[0])
+            rows = min(rows, 2000)
+            start = int(request.querystring.get('start', [0])[0])
+            fl = request.querystring.get('fl', ['id'])
+            resp['response']['docs'] = [
+                {field: doc.get(field) for field in fl}
+                for doc in docs[start:start + rows]
+            ]
+            resp['responseHeader']['params']['rows'] = rows
+            resp['responseHeader']['params']['fl'] = fl
+            if request.querystring.get('cursorMark'):
+                resp['nextCursorMark'] = "AoIH///3RmWrhAAjMTY0"
+            if request.querystring.get('facet.query'):
+                resp['facet_counts'] = {'facet_queries': dict(
+                    (fq, _count_matches(docs, fq))
+                    for fq in request.querystring['facet.query']
+                )}
+            if request.querystring.get('facet.field'):
+                resp.setdefault('facet_counts', {})['facet_fields'] = dict(
+                    (field, _field_counts(docs, field))
+                    for field in request.querystring['facet.field']
+                )
+            return 200, headers, json.dumps(resp)
+
+        HTTPretty.register_uri(
+            HTTPretty.POST,
+            self.api_endpoint,
+            body=request_callback,
+            content_type="application/json"
+        )
+
+
+def _count_matches(docs, query):
+    """
+    Count the docs for which a "field:value" query matches the value, or one
+    of the values, of that field
+    """
+    field, value = query.split(":", 1)
+    value = value.strip('"')
+    count = 0
+    for doc in docs:
+        values = doc.get(field)
+        if not isinstance(values, list):
+            values = [values]
+        count += value in [str(v) for v in values]
+    return count
+
+
+def _field_counts(docs, field):
+    """
+    solr style flat [value, count, ...] list of the values of `field`, most
+    common first
+    """
+    counts = {}
+    for doc in docs:
+        values = doc.get(field)
+        if not isinstance(values, list):
+            values = [values]
+        for value in values:
+            if value is not None:
+                counts[value] = counts.get(value, 0) + 1
+    flat = []
+    for value in sorted(counts, key=lambda v: (-counts[v], v)):
+        flat.extend([value, counts[value]])
+    return flat
+
+
+def _field_stats(docs, field):
+    """
+    (field, stats) with the basic solr statistics of a numeric field
+    """
+    values = [doc[field] for doc in docs if doc.get(field) is not None]
+    return field, {
+        'min': min(values),
+        'max': max(values),
+        'sum': sum(values),
+        'count': len(values),
+        'missing': len(docs) - len(values),
+        'mean': sum(values) / float(len(values)),
+    }
+
+
 class MockMetricsResponse(HTTPrettyMock):
     """
     context manager that mocks a metrics service response
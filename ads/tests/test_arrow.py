@@ -0,0 +1,91 @@
+"""
+Tests for the Arrow export of search results
+"""
+import datetime
+import json
+import unittest
+
+from .mocks import MockSolrResponse
+from .stubdata.solr import example_solr_response
+
+from ads.arrow import record_batch, arrow_schema, pa
+from ads.search import SearchQuery
+from ads.config import SEARCH_URL
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+
+@unittest.skipIf(pa is None, "pyarrow is not installed")
+class TestArrow(unittest.TestCase):
+    """
+    Test record batches, to_arrow() and to_pandas()
+    """
+
+    def setUp(self):
+        self.docs = json.loads(example_solr_response)['response']['docs']
+
+    def test_record_batch(self):
+        """
+        columns should be typed from ads.schema, multi-valued fields should
+        be list columns, and missing values should be null
+        """
+        fields = ["bibcode", "year", "pubdate", "author", "citation_count",
+                  "not_a_field"]
+        batch = record_batch(self.docs, fields)
+        self.assertEqual(batch.num_rows, 28)
+        self.assertEqual(batch.schema.names, fields)
+        self.assertEqual(batch.schema.field("year").type, pa.int64())
+        self.assertEqual(batch.schema.field("pubdate").type, pa.date32())
+        self.assertEqual(batch.schema.field("author").type,
+                         pa.list_(pa.string()))
+        self.assertEqual(batch.schema.field("not_a_field").type, pa.string())
+        self.assertEqual(batch.column(2)[0].as_py(), datetime.date(1971, 10, 1))
+        self.assertEqual(batch.column(3)[1].as_py()[0], "Sudilovsky, V.")
+        self.assertEqual(batch.column(5).null_count, 28)
+
+        self.assertEqual(arrow_schema(fields), batch.schema)
+
+        # values of untyped fields that are not strings are kept as JSON
+        docs = [{"x": 1}, {"x": [1, "a"]}, {"x": "b"}, {}]
+        batch = record_batch(docs, ["x"], schema=arrow_schema(["x"]))
+        self.assertEqual(batch.column(0).to_pylist(),
+                         ["1", '[1, "a"]', "b", None])
+
+    def test_to_arrow(self):
+        """
+        to_arrow() should fetch every page into one table with a single
+        schema
+        """
+        sq = SearchQuery(q="unittest", fl=["bibcode", "year", "author"],
+                         rows=10, start=0, max_pages=10)
+        with MockSolrResponse(SEARCH_URL):
+            batches = list(sq.iter_record_batches())
+        self.assertEqual([b.num_rows for b in batches], [10, 10, 8])
+        for batch in batches:
+            self.assertEqual(batch.schema, arrow_schema(sq._fields()))
+
+        sq = SearchQuery(q="unittest", fl=["bibcode", "year", "author"],
+                         rows=10, start=0, max_pages=10)
+        with MockSolrResponse(SEARCH_URL):
+            table = sq.to_arrow()
+        self.assertEqual(table.num_rows, 28)
+        self.assertEqual(table.column_names, ["id", "bibcode", "year",
+                                              "author"])
+        self.assertEqual(table.column("bibcode")[27].as_py(),
+                         "2009ApJ...699...56S")
+        self.assertEqual(len(sq.articles), 0)
+
+    @unittest.skipIf(pandas is None, "pandas is not installed")
+    def test_to_pandas(self):
+        """
+        to_pandas() should return a DataFrame with one row per doc
+        """
+        sq = SearchQuery(q="unittest", fl=["bibcode", "citation_count"],
+                         rows=10, start=0, max_pages=10)
+        with MockSolrResponse(SEARCH_URL):
+            df = sq.to_pandas()
+        self.assertEqual(len(df), 28)
+        self.assertEqual(df["citation_count"].sum(), 48)
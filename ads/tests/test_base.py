@@ -6,11 +6,13 @@ import json
 import unittest
 import requests
 import os
+from mock import Mock
 from tempfile import NamedTemporaryFile
 
 import ads.base
 import ads.config
-from ads.base import BaseQuery, APIResponse, RateLimits, _Singleton
+from ads.base import BaseQuery, APIResponse, RateLimits, _Singleton, \
+    get_json_decoder
 from .mocks import MockApiResponse
 
 
@@ -187,5 +189,49 @@ class TestRateLimits(unittest.TestCase):
         )
 
 
+class TestJsonDecoder(unittest.TestCase):
+    """
+    Test the choice of JSON decoder for responses
+    """
+    def tearDown(self):
+        ads.config.json_decoder = None
+
+    def test_get_json_decoder(self):
+        """
+        the stdlib decoder should be used when asked for, or when no faster
+        decoder is installed; a named decoder that isn't installed raises
+        """
+        self.assertIs(get_json_decoder("json"), json.loads)
+        self.assertTrue(callable(get_json_decoder()))
+        self.assertEqual(get_json_decoder()('{"a": [1]}'), {"a": [1]})
+        with self.assertRaises(ImportError):
+            get_json_decoder("not_a_json_module")
+
+    def test_configured_decoder(self):
+        """
+        responses should be decoded by ads.config.json_decoder, from bytes
+        when the response has them
+        """
+        seen = []
+
+        def decoder(body):
+            seen.append(body)
+            return json.loads(body)
+
+        ads.config.json_decoder = decoder
+        self.assertIs(get_json_decoder(), decoder)
+        with MockApiResponse('http://api.unittest'):
+            response = requests.get('http://api.unittest')
+        APIResponse._decode_json(response)
+        self.assertIsInstance(seen[0], bytes)
+
+        # the stdlib decoder takes the text
+        ads.config.json_decoder = "json"
+        self.assertEqual(APIResponse._decode_json(response),
+                         json.loads(response.text))
+        response = Mock(content=b"not json", text=u'{"a": [1]}')
+        self.assertEqual(APIResponse._decode_json(response), {"a": [1]})
+
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
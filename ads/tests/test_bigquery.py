@@ -0,0 +1,144 @@
+"""
+Tests for the bigquery interface
+"""
+import json
+import time
+import unittest
+
+from mock import patch
+
+from .mocks import MockBigQueryResponse
+from .stubdata.solr import example_solr_response
+
+from ads.bigquery import BigQuery, resolve_bibcodes
+from ads.search import Article
+from ads.config import BIGQUERY_URL
+
+
+class TestBigQuery(unittest.TestCase):
+    """
+    Test the BigQuery object
+    """
+
+    def setUp(self):
+        docs = json.loads(example_solr_response)['response']['docs']
+        self.bibcodes = [doc['bibcode'] for doc in docs]
+
+    def test_chunks(self):
+        """
+        the bibcodes should be posted in chunks, each chunk paginated until
+        it is exhausted, and repeated bibcodes only posted once
+        """
+        bq = BigQuery(self.bibcodes + self.bibcodes[:3], fl=["bibcode"],
+                      chunk_size=10, rows=4, start=0)
+        self.assertEqual(bq.progress, "Query has not been executed")
+        mock = MockBigQueryResponse(BIGQUERY_URL)
+        with mock:
+            articles = list(bq)
+        self.assertEqual([a.bibcode for a in articles], self.bibcodes)
+        self.assertEqual([len(r) for r in mock.requests],
+                         [10, 10, 10, 10, 10, 10, 8, 8])
+        self.assertEqual(mock.requests[0], self.bibcodes[:10])
+        self.assertEqual(bq.progress, "28/28")
+        self.assertEqual(len(bq.articles), 28)
+
+    def test_filtered(self):
+        """
+        bibcodes without a record should be skipped, and pages should be
+        available without building articles
+        """
+        bq = BigQuery(self.bibcodes[:5] + ["2099unknown"], fl=["bibcode"])
+        mock = MockBigQueryResponse(BIGQUERY_URL)
+        with mock:
+            responses = list(bq.iter_pages())
+        self.assertEqual(len(mock.requests), 1)
+        self.assertEqual([d["bibcode"] for d in responses[0].docs],
+                         self.bibcodes[:5])
+        self.assertEqual(bq.progress, "5/6")
+        self.assertEqual(len(bq.articles), 0)
+
+    def test_counts(self):
+        """
+        count() and count_many() should POST every chunk and sum the counts,
+        and the methods that can't be split across chunks should say so
+        """
+        bq = BigQuery(self.bibcodes[:10] + ["2099Test.....1....Z"],
+                      chunk_size=4)
+        mock = MockBigQueryResponse(BIGQUERY_URL)
+        with mock:
+            self.assertEqual(bq.count(), 10)
+            self.assertEqual(bq.count_many(["year:2012", "year:1971"]),
+                             [4, 1])
+        self.assertEqual([len(r) for r in mock.requests], [4, 4, 3] * 2)
+        self.assertIsNone(bq.response)
+
+        with self.assertRaises(ValueError):
+            bq.facets
+        with self.assertRaises(TypeError):
+            bq.execute_parallel()
+
+        bq = BigQuery(self.bibcodes[:10], facet_field="year")
+        mock = MockBigQueryResponse(BIGQUERY_URL)
+        with mock:
+            self.assertEqual(bq.facets.fields['year'],
+                             [('2013', 5), ('2012', 4), ('1971', 1)])
+        self.assertEqual(len(mock.requests), 1)
+        self.assertIsNone(bq.response)
+
+
+class TestResolveBibcodes(unittest.TestCase):
+    """
+    Test resolve_bibcodes()
+    """
+
+    def setUp(self):
+        docs = json.loads(example_solr_response)['response']['docs']
+        self.bibcodes = [doc['bibcode'] for doc in docs]
+
+    def test_resolve_bibcodes(self):
+        """
+        the records should come back in input order, alternate bibcodes
+        should be matched, and bibcodes without a record reported
+        """
+        bibcodes = [self.bibcodes[5], "2099unknown", "2012GCN.13229....1S",
+                    self.bibcodes[0], self.bibcodes[5]] + self.bibcodes[6:]
+        mock = MockBigQueryResponse(BIGQUERY_URL)
+        # httpretty mixes up the bodies of concurrent POSTs, so the chunks
+        # run one at a time here; see test_concurrent_chunks
+        with mock:
+            resolved = resolve_bibcodes(bibcodes, fl=["bibcode", "year"],
+                                        chunk_size=5, max_workers=1)
+        self.assertEqual(len(mock.requests), 6)
+        self.assertEqual(len(resolved), len(bibcodes))
+        self.assertEqual(resolved[0].bibcode, self.bibcodes[5])
+        self.assertIsNone(resolved[1])
+        self.assertEqual(resolved[2].bibcode, "2012GCN..13229...1S")
+        self.assertEqual(resolved[3].bibcode, self.bibcodes[0])
+        self.assertIs(resolved[4], resolved[0])
+        self.assertEqual([a.bibcode for a in resolved.articles[5:]],
+                         self.bibcodes[6:])
+        self.assertEqual(resolved.missing, ["2099unknown"])
+
+    def test_concurrent_chunks(self):
+        """
+        chunks that complete out of order should still be mapped back to
+        the input order
+        """
+        docs = json.loads(example_solr_response)['response']['docs']
+
+        class FakeBigQuery(object):
+            def __init__(self, bibcodes, **kwargs):
+                self.bibcodes = bibcodes
+
+            def __iter__(self):
+                # the first chunk finishes last
+                if self.bibcodes[0] == docs[-1]["bibcode"]:
+                    time.sleep(0.05)
+                return iter([Article(**doc) for doc in reversed(docs)
+                             if doc["bibcode"] in self.bibcodes])
+
+        with patch("ads.bigquery.BigQuery", FakeBigQuery):
+            resolved = resolve_bibcodes(self.bibcodes[::-1], chunk_size=3,
+                                        max_workers=4)
+        self.assertEqual([a.bibcode for a in resolved], self.bibcodes[::-1])
+        self.assertEqual(resolved.missing, [])
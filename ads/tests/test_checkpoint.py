@@ -0,0 +1,130 @@
+"""
+Tests for query checkpoints
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from .mocks import MockSolrResponse
+
+from ads.checkpoint import FileCheckpoint, SQLiteCheckpoint
+from ads.search import SearchQuery
+from ads.config import SEARCH_URL
+
+
+class TestCheckpoints(unittest.TestCase):
+    """
+    Test the FileCheckpoint and SQLiteCheckpoint objects
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_save_load(self):
+        """
+        a checkpoint should return the last saved state, or None
+        """
+        for checkpoint in [
+                FileCheckpoint(os.path.join(self.tmpdir, "harvest.json")),
+                SQLiteCheckpoint(os.path.join(self.tmpdir, "harvest.db"))]:
+            self.assertIsNone(checkpoint.load())
+            checkpoint.save({"fetched": 1})
+            checkpoint.save({"fetched": 2})
+            self.assertEqual(checkpoint.load(), {"fetched": 2})
+            checkpoint.clear()
+            self.assertIsNone(checkpoint.load())
+
+    def test_sqlite_names(self):
+        """
+        harvests with different names should not overwrite each other
+        """
+        path = os.path.join(self.tmpdir, "harvest.db")
+        SQLiteCheckpoint(path, name="a").save({"fetched": 1})
+        SQLiteCheckpoint(path, name="b").save({"fetched": 2})
+        self.assertEqual(SQLiteCheckpoint(path, name="a").load(),
+                         {"fetched": 1})
+
+
+class TestResume(unittest.TestCase):
+    """
+    Test SearchQuery.resume()
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "harvest.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_resume(self):
+        """
+        a resumed query should continue with the article after the last one
+        the original query handed out
+        """
+        with MockSolrResponse(SEARCH_URL):
+            everything = [a.bibcode for a in SearchQuery(
+                q="unittest", rows=5, max_pages=100, start=0)]
+
+            sq = SearchQuery(q="unittest", rows=5, max_pages=2, start=0,
+                             checkpoint=self.path)
+            first = [a.bibcode for a in sq]
+            self.assertEqual(first, everything[:10])
+
+            state = FileCheckpoint(self.path).load()
+            self.assertEqual(state["fetched"], 10)
+            self.assertEqual(state["query"]["start"], 10)
+
+            sq = SearchQuery.resume(self.path, max_pages=100)
+            self.assertEqual(sq.query["start"], 10)
+            rest = [a.bibcode for a in sq]
+            self.assertEqual(first + rest, everything)
+            self.assertEqual(sq.progress, "28/28")
+            self.assertEqual(FileCheckpoint(self.path).load()["fetched"], 28)
+
+        with self.assertRaises(AssertionError):
+            SearchQuery.resume(os.path.join(self.tmpdir, "missing.json"))
+
+    def test_resume_iter_pages(self):
+        """
+        a finished iter_pages() run should save its final state, so that
+        resuming it hands out no record again
+        """
+        with MockSolrResponse(SEARCH_URL):
+            sq = SearchQuery(q="unittest", rows=10, max_pages=100, start=0,
+                             checkpoint=self.path)
+            self.assertEqual(
+                sum(len(r.docs) for r in sq.iter_pages()), 28)
+            self.assertEqual(FileCheckpoint(self.path).load()["fetched"], 28)
+
+            sq = SearchQuery.resume(self.path)
+            self.assertEqual(
+                [d for r in sq.iter_pages() for d in r.docs], [])
+
+    def test_resume_at_max_pages(self):
+        """
+        a query that stopped at max_pages, resumed with the same max_pages,
+        should not fetch another page
+        """
+        with MockSolrResponse(SEARCH_URL):
+            sq = SearchQuery(q="unittest", rows=5, max_pages=2, start=0,
+                             checkpoint=self.path)
+            self.assertEqual(len(list(sq)), 10)
+
+            sq = SearchQuery.resume(self.path)
+            self.assertEqual(sq.max_pages, 2)
+            self.assertEqual(list(sq), [])
+            self.assertIsNone(sq.response)
+            self.assertEqual(list(SearchQuery.resume(self.path).iter_pages()),
+                             [])
+            self.assertEqual(list(SearchQuery.resume(self.path).iter_docs()),
+                             [])
+            self.assertEqual(sq.query["start"], 10)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
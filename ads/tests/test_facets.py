@@ -0,0 +1,88 @@
+"""
+Tests for the facet component
+"""
+import unittest
+
+from ads.facets import FacetResult, RangeFacet, PivotFacet, facet_params
+
+
+class TestFacetParams(unittest.TestCase):
+    """
+    Test facet_params()
+    """
+
+    def test_no_facets(self):
+        """
+        no params should be added if no facets were requested
+        """
+        self.assertEqual(facet_params(limit=10), {})
+
+    def test_params(self):
+        """
+        field, range and pivot facets should map onto solr params
+        """
+        params = facet_params(
+            field="bibstem",
+            range={"field": "year", "start": 2000, "end": 2010, "gap": 5},
+            pivot=["bibstem", "year"],
+            limit=20,
+            mincount=1,
+        )
+        self.assertEqual(params, {
+            "facet": "true",
+            "facet.field": ["bibstem"],
+            "facet.range": ["year"],
+            "f.year.facet.range.start": 2000,
+            "f.year.facet.range.end": 2010,
+            "f.year.facet.range.gap": 5,
+            "facet.pivot": ["bibstem,year"],
+            "facet.limit": 20,
+            "facet.mincount": 1,
+        })
+        self.assertEqual(
+            facet_params(pivot=["bibstem,year", ["doctype", "year"]])
+            ["facet.pivot"],
+            ["bibstem,year", "doctype,year"]
+        )
+
+
+class TestFacetResult(unittest.TestCase):
+    """
+    Test FacetResult parsing
+    """
+
+    def test_init(self):
+        """
+        each section of facet_counts should be parsed into typed objects
+        """
+        fr = FacetResult({
+            "facet_queries": {"year:2000": 12},
+            "facet_fields": {"bibstem": ["ApJ", 10, "MNRAS", 4]},
+            "facet_ranges": {"year": {
+                "counts": ["2000", 3, "2005", 7],
+                "gap": 5, "start": 2000, "end": 2010
+            }},
+            "facet_pivot": {"bibstem,year": [
+                {"field": "bibstem", "value": "ApJ", "count": 10, "pivot": [
+                    {"field": "year", "value": 2000, "count": 6}
+                ]}
+            ]},
+        })
+        self.assertEqual(fr.queries, {"year:2000": 12})
+        self.assertEqual(fr.fields["bibstem"], [("ApJ", 10), ("MNRAS", 4)])
+
+        rf = fr.ranges["year"]
+        self.assertIsInstance(rf, RangeFacet)
+        self.assertEqual(rf.counts, [("2000", 3), ("2005", 7)])
+        self.assertEqual((rf.start, rf.end, rf.gap), (2000, 2010, 5))
+
+        pf = fr.pivots["bibstem,year"][0]
+        self.assertIsInstance(pf, PivotFacet)
+        self.assertEqual((pf.field, pf.value, pf.count),
+                         ("bibstem", "ApJ", 10))
+        self.assertEqual(pf.pivot[0].value, 2000)
+        self.assertEqual(pf.pivot[0].pivot, [])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,90 @@
+"""
+Tests for bulk identifier resolution
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from .mocks import MockSolrResponse
+
+from ads.identifiers import normalize_identifier, resolve_identifiers, \
+    IdentifierMemo, SQLiteIdentifierMemo
+from ads.config import SEARCH_URL
+
+
+class TestResolveIdentifiers(unittest.TestCase):
+    """
+    Test normalize_identifier(), resolve_identifiers() and the memos
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_normalize_identifier(self):
+        """
+        DOIs and arXiv ids should be normalized to the form ADS indexes
+        """
+        self.assertEqual(normalize_identifier("doi:10.1086/521525"),
+                         "10.1086/521525")
+        self.assertEqual(normalize_identifier("https://doi.org/10.1086/521525"),
+                         "10.1086/521525")
+        self.assertEqual(normalize_identifier("arXiv:0705.0706v2"),
+                         "arXiv:0705.0706")
+        self.assertEqual(normalize_identifier("0705.0706"), "arXiv:0705.0706")
+        self.assertEqual(normalize_identifier("astro-ph/0101001"),
+                         "arXiv:astro-ph/0101001")
+        self.assertEqual(normalize_identifier(" 2012GCN.13229....1S "),
+                         "2012GCN.13229....1S")
+
+    def test_resolve_identifiers(self):
+        """
+        identifiers should be matched on the identifier, doi and alternate
+        bibcode fields, in input order, with unresolved ones mapped to None
+        """
+        identifiers = ["10.1086/521525", "arxiv:1302.6362v1",
+                       "2012GCN.13229....1S", "10.9999/missing",
+                       "https://doi.org/10.1126/SCIENCE.174.4005.142",
+                       "10.1086/521525"]
+        with MockSolrResponse(SEARCH_URL):
+            resolved = resolve_identifiers(identifiers, chunk_size=2,
+                                           max_workers=1)
+        self.assertEqual(list(resolved.items()), [
+            ("10.1086/521525", "2007ApJ...669..741S"),
+            ("arxiv:1302.6362v1", "2013A&A...552A.143S"),
+            ("2012GCN.13229....1S", "2012GCN..13229...1S"),
+            ("10.9999/missing", None),
+            ("https://doi.org/10.1126/SCIENCE.174.4005.142",
+             "1971Sci...174..142S"),
+        ])
+
+    def test_memo(self):
+        """
+        remembered identifiers, found or not, should not be sent to the API
+        again, and a SQLite memo should persist
+        """
+        path = os.path.join(self.tmpdir, "memo.db")
+        memo = SQLiteIdentifierMemo(path)
+        with MockSolrResponse(SEARCH_URL):
+            resolve_identifiers(["10.1086/521525", "10.9999/missing"],
+                                memo=memo)
+        self.assertEqual(
+            SQLiteIdentifierMemo(path).get_many(
+                ["10.1086/521525", "10.9999/missing", "10.1/other"]),
+            {"10.1086/521525": "2007ApJ...669..741S", "10.9999/missing": None}
+        )
+        self.assertEqual(len(SQLiteIdentifierMemo(path).get_many(
+            ["10.1086/521525"])), 1)
+        # no mocked API: anything that is not remembered would fail
+        resolved = resolve_identifiers(["doi:10.1086/521525", "10.9999/MISSING"],
+                                       memo=path)
+        self.assertEqual(list(resolved.values()),
+                         ["2007ApJ...669..741S", None])
+
+        memo = IdentifierMemo()
+        memo.update({"arxiv:0705.0706": "2007ApJ...669..741S"})
+        self.assertEqual(resolve_identifiers(["0705.0706"], memo=memo),
+                         {"0705.0706": "2007ApJ...669..741S"})
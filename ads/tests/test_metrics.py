@@ -1,12 +1,15 @@
 """
 Tests for MetricsQuery
 """
+import json
 import unittest
 import six
 
 from .mocks import MockResponse, MockMetricsResponse
+from .stubdata.metrics import example_metrics_response
 
-from ads.metrics import MetricsQuery, MetricsResponse
+import ads.config
+from ads.metrics import MetricsQuery, MetricsResponse, merge_metrics
 from ads.config import METRICS_URL
 
 
@@ -33,6 +36,83 @@ class TestMetricsQuery(unittest.TestCase):
             retval = mq.execute()
         self.assertIsInstance(mq.response, MetricsResponse)
         self.assertEqual(retval, mq.response.metrics)
+        self.assertEqual(mq.response.unmerged, [])
+
+    def test_execute_chunked(self):
+        """
+        bibcodes beyond chunk_size should be sent in concurrent chunks, and
+        the metrics of the chunks merged
+        """
+        mq = MetricsQuery(["b1", "b2", "b3", "b4", "b5", "b1"], chunk_size=2,
+                          max_workers=2)
+        with MockMetricsResponse(METRICS_URL):
+            metrics = mq.execute()
+        # the mock service returns the metrics of one paper for every chunk
+        self.assertEqual(len(mq.responses), 3)
+        self.assertEqual(metrics["basic stats"]["number of papers"], 3)
+        self.assertEqual(metrics["basic stats"]["total number of reads"], 333)
+        self.assertEqual(metrics["indicators"]["i10"], 3)
+        self.assertIsNone(metrics["indicators"]["h"])
+        self.assertIn("indicators/h", mq.response.unmerged)
+        self.assertEqual(json.loads(mq.response._raw), metrics)
+
+        ads.config.keep_raw = False
+        try:
+            with MockMetricsResponse(METRICS_URL):
+                mq.execute()
+        finally:
+            ads.config.keep_raw = True
+        self.assertIsNone(mq.response._raw)
+
+
+class TestMergeMetrics(unittest.TestCase):
+    """
+    test merge_metrics()
+    """
+
+    def test_merge(self):
+        """
+        additive metrics should be summed, averages weighted by the number
+        of papers, and the others flagged
+        """
+        a = json.loads(example_metrics_response)
+        b = json.loads(example_metrics_response)
+        b["basic stats"].update({"number of papers": 3,
+                                 "average number of reads": 11.0,
+                                 "total number of reads": 33})
+        b["histograms"]["reads"]["all reads"] = {"2002": 1, "2030": 5}
+        b["skipped bibcodes"] = ["b1"]
+
+        merged, unmerged = merge_metrics([a, b])
+        stats = merged["basic stats"]
+        self.assertEqual(stats["number of papers"], 4)
+        self.assertEqual(stats["total number of reads"], 144)
+        self.assertEqual(stats["average number of reads"], 36.0)
+        self.assertIsNone(stats["median number of reads"])
+        self.assertEqual(merged["citation stats"]["total number of citations"],
+                         132)
+        reads = merged["histograms"]["reads"]["all reads"]
+        self.assertEqual(reads["2002"], 15)
+        self.assertEqual(reads["2030"], 5)
+        self.assertEqual(merged["skipped bibcodes"], ["b1"])
+        self.assertEqual(merged["time series"]["i10"]["2000"], 2)
+        self.assertIsNone(merged["time series"]["h"])
+        self.assertIn("basic stats/median number of reads", unmerged)
+        self.assertNotIn("basic stats/total number of reads", unmerged)
+
+    def test_merge_lists_and_empty_sections(self):
+        """
+        lists should be concatenated without repeats, and sections that are
+        None in every chunk skipped
+        """
+        a = {"skipped bibcodes": ["b1"], "self-citations": ["c1", "c2"],
+             "time series": None}
+        b = {"skipped bibcodes": ["b2"], "self-citations": ["c2", "c3"],
+             "time series": None}
+        merged, unmerged = merge_metrics([a, b])
+        self.assertEqual(merged, {"skipped bibcodes": ["b1", "b2"],
+                                  "self-citations": ["c1", "c2", "c3"]})
+        self.assertEqual(unmerged, [])
 
 
 class TestMetricsResponse(unittest.TestCase):
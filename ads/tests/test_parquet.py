@@ -0,0 +1,138 @@
+"""
+Tests for the partitioned Parquet dataset writer
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import patch
+
+from .mocks import MockSolrResponse
+
+from ads.arrow import pa
+from ads.parquet import ParquetDataset, pq
+from ads.search import SearchQuery
+from ads.config import SEARCH_URL
+
+
+@unittest.skipIf(pa is None, "pyarrow is not installed")
+class TestParquetDataset(unittest.TestCase):
+    """
+    Test the ParquetDataset object
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "harvest")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def query(self, max_pages):
+        return SearchQuery(q="unittest",
+                           fl=["bibcode", "year", "author", "keyword_norm"],
+                           rows=10, start=0, max_pages=max_pages)
+
+    def test_write_resume(self):
+        """
+        pages should be written into one directory per partition, and a
+        resumed harvest should append the pages that follow
+        """
+        dataset = ParquetDataset(self.path, partition_by="year",
+                                 commit_every=1)
+        with MockSolrResponse(SEARCH_URL):
+            self.assertEqual(dataset.write(self.query(max_pages=1)), 10)
+        self.assertEqual(sorted(os.listdir(self.path)), [
+            "_ads_dataset.json", "year=1971", "year=2012", "year=2013"])
+        self.assertEqual(dataset.checkpoint.load()["query"]["start"], 10)
+
+        sq = dataset.resume(max_pages=10)
+        with MockSolrResponse(SEARCH_URL):
+            self.assertEqual(dataset.write(sq), 18)
+        table = dataset.to_arrow()
+        self.assertEqual(table.num_rows, 28)
+        self.assertEqual(sorted(set(table.column("year").to_pylist())),
+                         [1971, 2007, 2009, 2011, 2012, 2013])
+        self.assertEqual(len(set(table.column("bibcode").to_pylist())), 28)
+        self.assertEqual(table.schema.field("author").type,
+                         pa.list_(pa.string()))
+        # untyped, and null on the first page only
+        self.assertEqual(table.schema.field("keyword_norm").type, pa.string())
+
+    def test_row_groups(self):
+        """
+        small pages should be buffered per partition into row groups of
+        row_group_size rows, rather than one row group per page
+        """
+        dataset = ParquetDataset(self.path, partition_by="year",
+                                 row_group_size=5)
+        sq = SearchQuery(q="unittest", fl=["bibcode", "year"], rows=2,
+                         start=0, max_pages=100)
+        with MockSolrResponse(SEARCH_URL):
+            self.assertEqual(dataset.write(sq), 28)
+        sizes = {}
+        for name in dataset.files:
+            metadata = pq.ParquetFile(os.path.join(self.path, name)).metadata
+            sizes[name.split(os.sep)[0]] = [
+                metadata.row_group(i).num_rows
+                for i in range(metadata.num_row_groups)
+            ]
+        # 12 records from 2012 and 11 from 2013, 2 per page at most
+        for partition, total in [("year=2012", 12), ("year=2013", 11)]:
+            self.assertEqual(sum(sizes[partition]), total)
+            self.assertLessEqual(len(sizes[partition]), 3)
+            for size in sizes[partition][:-1]:
+                self.assertGreaterEqual(size, 5)
+        self.assertEqual(dataset.to_arrow().num_rows, 28)
+
+        # the buffers of all partitions together stay under the cap
+        shutil.rmtree(self.path)
+        dataset = ParquetDataset(self.path, partition_by="year",
+                                 row_group_size=5, max_buffered_rows=3)
+        sq = SearchQuery(q="unittest", fl=["bibcode", "year"], rows=2,
+                         start=0, max_pages=100)
+        write_batch = ParquetDataset._write_batch
+        buffered = []
+
+        def record_buffered(self, batch):
+            write_batch(self, batch)
+            buffered.append(sum(w.n_pending for w in self._writers.values()))
+
+        with patch.object(ParquetDataset, "_write_batch", record_buffered):
+            with MockSolrResponse(SEARCH_URL):
+                self.assertEqual(dataset.write(sq), 28)
+        self.assertLessEqual(max(buffered), 3)
+        self.assertEqual(dataset.to_arrow().num_rows, 28)
+
+    def test_interrupted_write(self):
+        """
+        files that were not committed should not become part of the dataset
+        """
+        dataset = ParquetDataset(self.path, partition_by="year",
+                                 commit_every=2)
+        write_batch = ParquetDataset._write_batch
+        calls = []
+
+        def fail_on_third_page(self, batch):
+            calls.append(batch)
+            if len(calls) == 3:
+                raise RuntimeError("interrupted")
+            write_batch(self, batch)
+
+        with patch.object(ParquetDataset, "_write_batch", fail_on_third_page):
+            with MockSolrResponse(SEARCH_URL):
+                with self.assertRaises(RuntimeError):
+                    dataset.write(self.query(max_pages=10))
+        self.assertEqual(dataset.to_arrow().num_rows, 20)
+        self.assertEqual(dataset.checkpoint.load()["fetched"], 20)
+        self.assertFalse([name for name in os.listdir(self.path)
+                          if name.startswith(".staging-")])
+
+        # a file moved into the dataset but never committed
+        orphan = os.path.join(self.path, "year=2012", "part-orphan.parquet")
+        open(orphan, "w").close()
+        with MockSolrResponse(SEARCH_URL):
+            dataset.write(dataset.resume(max_pages=10))
+        self.assertFalse(os.path.exists(orphan))
+        self.assertEqual(dataset.to_arrow().num_rows, 28)
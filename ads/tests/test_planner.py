@@ -0,0 +1,141 @@
+"""
+Tests for the planning of queries that are too long for a URL
+"""
+import json
+import unittest
+
+import requests
+import six
+from six.moves.urllib.parse import quote_plus
+
+from .mocks import MockSolrResponse, MockBigQueryResponse
+from .stubdata.solr import example_solr_response
+
+from ads.bigquery import BigQuery
+from ads.planner import ChunkedSearchQuery, split_disjunction, chunk_terms, \
+    plan_query
+from ads.search import SearchQuery
+from ads.config import SEARCH_URL, BIGQUERY_URL
+
+
+def _url(query):
+    return requests.Request("GET", SEARCH_URL, params=query).prepare().url
+
+
+class TestPlanner(unittest.TestCase):
+    """
+    Tests for ChunkedSearchQuery and plan_query()
+    """
+
+    def setUp(self):
+        docs = json.loads(example_solr_response)['response']['docs']
+        self.bibcodes = [doc['bibcode'] for doc in docs]
+        self.dois = ['"10.{}/{}"'.format(1000 + i, "x" * 20)
+                     for i in range(300)]
+
+    def test_split(self):
+        """
+        split_disjunction() should only split on top level ORs, and
+        chunk_terms() should keep every chunk within the budget
+        """
+        self.assertEqual(
+            split_disjunction('doi:("a" OR "b OR c" OR (d OR e))'),
+            ("doi", ['"a"', '"b OR c"', '(d OR e)'])
+        )
+        self.assertEqual(split_disjunction('star OR "galaxy"'),
+                         (None, ['star', '"galaxy"']))
+        self.assertIsNone(split_disjunction('doi:("a OR b")'))
+        # a field group has to span the whole clause
+        self.assertIsNone(split_disjunction(
+            'bibcode:("a" OR "b") AND year:(2000 OR 2001)'))
+        self.assertIsNone(split_disjunction(
+            'year:(2000 OR 2001) AND doi:("a" OR "b")'))
+        self.assertIsNone(split_disjunction('a AND b OR c'))
+        self.assertIsNone(split_disjunction('doi:("a" OR "b"'))
+        self.assertEqual(split_disjunction('title:(x) OR abstract:(y)'),
+                         (None, ['title:(x)', 'abstract:(y)']))
+
+        chunks = chunk_terms("doi", self.dois, 500)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(
+            sum(len(split_disjunction(c)[1]) for c in chunks), 300)
+        for chunk in chunks:
+            self.assertLessEqual(len(quote_plus(chunk)), 500)
+
+    def test_chunked(self):
+        """
+        the OR-list should be split into queries whose URLs fit, and records
+        that more than one chunk matches should only be returned once
+        """
+        fq = "doi:({})".format(" OR ".join(self.dois))
+        sq = ChunkedSearchQuery(q="star", fq=["year:2000", fq],
+                                fl=["bibcode"], max_url_length=2000)
+        self.assertGreater(len(sq.shards), 1)
+        for shard in sq.shards:
+            self.assertEqual(shard.query['q'], "star")
+            self.assertEqual(shard.query['fq'][0], "year:2000")
+            self.assertLessEqual(len(_url(shard.query)), 2000 - 200)
+
+        with MockSolrResponse(SEARCH_URL):
+            articles = list(sq)
+        sq.close()
+        # the mock server ignores fq, so every chunk returns the same records
+        self.assertEqual(sorted(a.bibcode for a in articles),
+                         sorted(self.bibcodes))
+
+        sq = ChunkedSearchQuery(q="star", fq="year:2000")
+        self.assertEqual(len(sq.shards), 1)
+
+    def test_plan_query(self):
+        """
+        plan_query() should pick GET, chunking, or the bigquery service for
+        lists of bibcodes
+        """
+        self.assertIsInstance(plan_query(q="star"), SearchQuery)
+        self.assertNotIsInstance(plan_query(q="star"), ChunkedSearchQuery)
+
+        q = " OR ".join(self.dois)
+        self.assertIsInstance(plan_query(q=q), ChunkedSearchQuery)
+
+        bibcodes = self.bibcodes * 10 + ["9999Test.....{:04d}Z".format(i)
+                                         for i in range(200)]
+        bq = plan_query(q="star", fq=["bibcode:({})".format(
+            " OR ".join('"{}"'.format(b) for b in bibcodes)), "year:2000"],
+            fl=["bibcode"])
+        self.assertIsInstance(bq, BigQuery)
+        self.assertEqual(bq.bibcodes[:28], self.bibcodes)
+        self.assertEqual(len(bq.bibcodes), 228)
+        self.assertEqual(bq.query['q'], "star")
+        self.assertEqual(bq.query['fq'], ["year:2000"])
+        with MockBigQueryResponse(BIGQUERY_URL):
+            self.assertEqual([a.bibcode for a in bq], self.bibcodes)
+
+        with self.assertRaises(ValueError):
+            plan_query(q="a" * 5000)
+
+        # an OR-list ANDed with other clauses can't be split
+        bibcodes = " OR ".join('"{}"'.format(b) for b in self.bibcodes * 20)
+        with self.assertRaises(ValueError):
+            plan_query(q="bibcode:({}) AND year:(2000 OR 2001)".format(bibcodes))
+        with self.assertRaises(ValueError):
+            plan_query(q="year:(2000 OR 2001) AND doi:({})".format(
+                " OR ".join(self.dois)))
+        # but the clean list in fq is
+        sq = plan_query(q="year:(2000 OR 2001) AND star",
+                        fq="doi:({})".format(" OR ".join(self.dois)))
+        self.assertIsInstance(sq, ChunkedSearchQuery)
+        for shard in sq.shards:
+            self.assertEqual(shard.query['q'], "year:(2000 OR 2001) AND star")
+            self.assertTrue(shard.query['fq'].startswith('doi:("10.'))
+
+        sq = plan_query(q=" OR ".join("title:({}) OR abstract:({})".format(
+            d, d) for d in self.dois))
+        self.assertIsInstance(sq, ChunkedSearchQuery)
+        self.assertGreater(len(sq.shards), 1)
+        for shard in sq.shards:
+            for term in split_disjunction(shard.query['q'])[1]:
+                six.assertRegex(self, term, r'^(title|abstract):\("[^"]+"\)$')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,140 @@
+"""
+Tests for the columnar ResultSet
+"""
+import json
+import unittest
+
+from .mocks import MockSolrResponse
+from .stubdata.solr import example_solr_response
+
+from ads.resultset import ResultSet, np
+from ads.search import SearchQuery
+from ads.config import SEARCH_URL
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestResultSet(unittest.TestCase):
+    """
+    Test the ResultSet object
+    """
+
+    def setUp(self):
+        self.docs = json.loads(example_solr_response)['response']['docs']
+        self.rs = ResultSet.from_docs(
+            self.docs, fields=["bibcode", "year", "citation_count",
+                               "read_count", "not_a_field"])
+
+    def test_from_docs(self):
+        """
+        numeric fields should become numpy arrays and everything else lists
+        """
+        self.assertEqual(len(self.rs), 28)
+        self.assertEqual(self.rs["citation_count"].dtype, np.int64)
+        self.assertEqual(self.rs["read_count"].dtype, np.float64)
+        self.assertIsInstance(self.rs["bibcode"], list)
+        self.assertIsInstance(self.rs["year"], list)
+        # a field that is missing from every doc
+        self.assertEqual(self.rs["not_a_field"], [None] * 28)
+
+        rs = ResultSet.from_docs([{"a": 1}, {"a": None}, {"b": "x"}])
+        self.assertEqual(rs.fields, ["a", "b"])
+        self.assertTrue(np.isnan(rs["a"][1]))
+
+    def test_typed(self):
+        """
+        typed columns should be converted with ads.schema, so that dates can
+        be filtered and sorted on directly
+        """
+        rs = ResultSet.from_docs(
+            self.docs, fields=["bibcode", "year", "pubdate", "indexstamp",
+                               "author", "classic_factor"], typed=True)
+        self.assertEqual(rs["year"].dtype, np.int64)
+        self.assertEqual(rs["pubdate"].dtype, np.dtype("datetime64[D]"))
+        self.assertEqual(rs["pubdate"][0], np.datetime64("1971-10-01"))
+        self.assertEqual(rs["indexstamp"].dtype, np.dtype("datetime64[ms]"))
+        self.assertIsInstance(rs["author"][0], list)
+        self.assertIsInstance(rs["classic_factor"], np.ndarray)
+
+        recent = rs.filter(rs["pubdate"] >= np.datetime64("2013-01-01"))
+        self.assertEqual(len(recent), 11)
+        latest = rs.sort("pubdate", descending=True)
+        self.assertEqual(latest["bibcode"][0], "2013A&A...552A.143S")
+        self.assertEqual(latest["pubdate"][-1], np.datetime64("1971-10-01"))
+
+        rs = ResultSet.from_docs([{"pubdate": None}, {"pubdate": "2001-02-03"}],
+                                 typed=True)
+        self.assertTrue(np.isnat(rs["pubdate"][0]))
+        self.assertEqual(rs.sort("pubdate", descending=True)["pubdate"][0],
+                         np.datetime64("2001-02-03"))
+
+    def test_filter_sort(self):
+        """
+        filter() should take a boolean mask and sort() should be stable with
+        missing values last
+        """
+        cited = self.rs.filter(self.rs["citation_count"] > 0)
+        self.assertEqual(len(cited), 8)
+        top = cited.sort("citation_count", descending=True)
+        self.assertEqual(top["bibcode"][:2],
+                         ["2007ApJ...669..741S", "2009ApJ...699...56S"])
+        self.assertEqual(top["bibcode"][2], "2012GCN..13129...1S")
+
+        by_year = self.rs.sort("year")
+        self.assertEqual(by_year["year"][0], "1971")
+        self.assertEqual(by_year["year"][-1], "2013")
+
+        rs = ResultSet.from_docs([{"a": "b"}, {"a": None}, {"a": "a"}])
+        self.assertEqual(rs.sort("a", descending=True)["a"], ["b", "a", None])
+
+    def test_group_by(self):
+        """
+        group_by() should aggregate other fields per distinct value
+        """
+        groups = self.rs.group_by(
+            "year", citations=("citation_count", "sum"),
+            reads=("read_count", "max"), mean_citations=("citation_count", "mean"))
+        self.assertEqual(groups["year"],
+                         ["1971", "2012", "2013", "2011", "2007", "2009"])
+        self.assertEqual(groups["count"].tolist(), [1, 12, 11, 2, 1, 1])
+        self.assertEqual(groups["citations"].dtype, np.int64)
+        self.assertEqual(groups["citations"].tolist(),
+                         [0, 2, 4, 0, 30, 12])
+        self.assertEqual(groups["reads"][2], 11.0)
+        self.assertAlmostEqual(groups["mean_citations"][2], 4 / 11.)
+
+        # missing values are a group of their own, in order of appearance
+        rs = ResultSet.from_docs([{"a": "y", "n": 1}, {"a": None, "n": 2},
+                                  {"a": "x", "n": 3}, {"a": "y", "n": 4}])
+        groups = rs.group_by("a", n=("n", "sum"))
+        self.assertEqual(groups["a"], ["y", None, "x"])
+        self.assertEqual(groups["n"].tolist(), [5, 2, 3])
+        groups = ResultSet.from_docs([{"a": ["x"]}, {"a": ["x"]}]).group_by("a")
+        self.assertEqual(groups["count"].tolist(), [2])
+
+    def test_concat(self):
+        """
+        concat() should join ResultSets end to end
+        """
+        rs = ResultSet.concat([self.rs, self.rs])
+        self.assertEqual(len(rs), 56)
+        self.assertEqual(rs["citation_count"].dtype, np.int64)
+        self.assertEqual(rs.to_dict()["bibcode"][28], "1971Sci...174..142S")
+
+    def test_search_query(self):
+        """
+        SearchQuery.result_set() should fetch every page into one ResultSet
+        without building articles
+        """
+        sq = SearchQuery(q="unittest", rows=10, start=0, max_pages=10,
+                         fl=["bibcode", "citation_count"])
+        with MockSolrResponse(SEARCH_URL):
+            rs = sq.result_set()
+        self.assertEqual(rs.fields, ["id", "bibcode", "citation_count"])
+        self.assertEqual(len(rs), 28)
+        self.assertEqual(int(rs["citation_count"].sum()), 48)
+        self.assertEqual(sq.articles, [])
+        self.assertEqual(sq.progress, "28/28")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
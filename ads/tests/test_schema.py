@@ -0,0 +1,58 @@
+"""
+Tests for the field type schema
+"""
+import datetime
+import unittest
+
+from ads import schema
+from ads.search import Article
+
+
+class TestSchema(unittest.TestCase):
+    """
+    Test the conversion of raw field values
+    """
+
+    def test_convert(self):
+        """
+        each field should be converted to its registered type, and missing
+        values should stay missing
+        """
+        self.assertEqual(schema.convert("year", "2012"), 2012)
+        self.assertEqual(schema.convert("read_count", 3.0), 3)
+        self.assertEqual(schema.convert("pubdate", "2012-00-00"),
+                         datetime.date(2012, 1, 1))
+        self.assertEqual(schema.convert("pubdate", "1971-10-00"),
+                         datetime.date(1971, 10, 1))
+        self.assertEqual(schema.convert("indexstamp", "2015-04-11T13:53:02.829Z"),
+                         datetime.datetime(2015, 4, 11, 13, 53, 2, 829000))
+        self.assertEqual(schema.convert("indexstamp", "2015-04-11T13:53:02Z"),
+                         datetime.datetime(2015, 4, 11, 13, 53, 2))
+        self.assertEqual(schema.convert("doi", "10.1/x"), ["10.1/x"])
+        self.assertEqual(schema.convert("author", None), [])
+        self.assertIsNone(schema.convert("pubdate", None))
+        self.assertEqual(schema.convert("bibcode", "2012x"), "2012x")
+
+    def test_register_field(self):
+        """
+        registered fields should be converted with their new type
+        """
+        schema.register_field("unittest_count", schema.INT)
+        try:
+            self.assertEqual(schema.convert("unittest_count", "7"), 7)
+        finally:
+            del schema.FIELD_TYPES["unittest_count"]
+        with self.assertRaises(AssertionError):
+            schema.register_field("unittest_count", int)
+
+    def test_article_typed(self):
+        """
+        Article.typed should convert the article's fields on access
+        """
+        article = Article(bibcode="2013A&A...552A.143S", year="2013",
+                          pubdate="2013-04-00", author=["Sudilovsky, V."])
+        self.assertEqual(article.year, "2013")
+        self.assertEqual(article.typed.year, 2013)
+        self.assertEqual(article.typed.pubdate, datetime.date(2013, 4, 1))
+        self.assertEqual(article.typed.author, ["Sudilovsky, V."])
+        self.assertEqual(article.typed.bibcode, "2013A&A...552A.143S")
@@ -2,16 +2,23 @@
 """
 Tests for the search interface
 """
+import gc
+import json
+import pickle
 import sys
 import unittest
+import weakref
 import requests
 from mock import patch
 import six
 import warnings
 
+import ads.config
+
 from ads.tests.mocks import MockResponse, MockSolrResponse, MockExportResponse
 
-from ads.search import SearchQuery, SolrResponse, APIResponse, Article, query
+from ads.search import SearchQuery, SolrResponse, APIResponse, Article, query, \
+    ShardedSearchQuery, AdaptiveRows, range_shards, prefix_shards, ijson
 from ads.exceptions import APIResponseError, SolrResponseParseError
 from ads.config import SEARCH_URL, EXPORT_URL
 
@@ -71,6 +78,40 @@ class TestArticle(unittest.TestCase):
                 msg="Instance attribute and _raw mismatch on {}".format(key)
             )
 
+    def test_compact_storage(self):
+        """
+        articles should keep their values only in ._raw, and articles from
+        one response should share a single field layout
+        """
+        self.article.bibstem = "A&A"
+        self.assertEqual(self.article._raw['bibstem'], "A&A")
+        self.assertNotIn('bibstem', getattr(self.article, '__dict__', {}))
+        self.assertNotIn('year', getattr(self.article, '__dict__', {}))
+        self.assertEqual(self.article.bibstem, "A&A")
+        with self.assertRaises(AttributeError):
+            self.article.not_a_field
+
+        sq = SearchQuery(q="unittest", rows=3, fl=["bibcode", "year"])
+        with MockSolrResponse(SEARCH_URL):
+            articles = list(sq)
+        self.assertIs(articles[0]._raw._layout, articles[2]._raw._layout)
+        self.assertEqual(dict(articles[1]._raw), {
+            "id": "1954679", "bibcode": "2012GCN..13229...1S", "year": "2012"
+        })
+
+        # a field added to the shared layout by one article stays missing,
+        # and so lazy loaded, in the articles built after it
+        sq = SearchQuery(q="unittest", rows=3, fl=["bibcode", "year"])
+        with MockSolrResponse(SEARCH_URL):
+            sq.execute()
+        sq.articles[0].bibstem = "A&A"
+        self.assertNotIn("bibstem", sq.articles[2]._raw)
+        self.assertEqual(sq.articles[2]._raw["year"], "2012")
+
+        # the layout's lock must not get in the way of pickling
+        copy = pickle.loads(pickle.dumps(articles[1]))
+        self.assertEqual(dict(copy._raw), dict(articles[1]._raw))
+
     def test_print_methods(self):
         """
         the class should return a user-friendly formatted identified when the
@@ -139,6 +180,43 @@ class TestArticle(unittest.TestCase):
             self.assertEqual(self.article.read_count, 0.0)
             self.assertIsNone(self.article.issue)
 
+    def test_get_field_hydrates_page(self):
+        """
+        lazily loading a field on an article from a SolrResponse should load
+        it for every article of that response with a single request
+        """
+        sq = SearchQuery(q="unittest", rows=5, start=0, fl=["bibcode"])
+        with MockSolrResponse(SEARCH_URL):
+            articles = list(sq)
+            with patch.object(SearchQuery, "_fetch", autospec=True,
+                              side_effect=SearchQuery._fetch) as fetch:
+                with warnings.catch_warnings(record=True):
+                    self.assertEqual(articles[0].year, '1971')
+                    self.assertEqual([a.year for a in articles[1:]],
+                                     ['2012'] * 4)
+                    self.assertEqual(articles[3]._raw['year'], '2012')
+                self.assertEqual(fetch.call_count, 1)
+                self.assertEqual(
+                    fetch.call_args[0][1]['q'],
+                    "id:(9535116 OR 1954679 OR 1954472 OR 1954502 OR 1954686)"
+                )
+
+    def test_hydrate(self):
+        """
+        SearchQuery.hydrate() should load fields for the fetched articles and
+        add them to fl for the next pages
+        """
+        sq = SearchQuery(q="unittest", rows=3, start=0, max_pages=2,
+                         fl=["bibcode"])
+        with MockSolrResponse(SEARCH_URL):
+            next(sq)
+            sq.hydrate(["year", "citation_count"])
+            self.assertEqual(sq.query['fl'],
+                             ["id", "bibcode", "year", "citation_count"])
+            self.assertEqual(sq.articles[2]._raw['citation_count'], 0)
+            self.assertEqual(len(list(sq)), 5)
+        self.assertEqual(sq.articles[-1]._raw['year'], '2013')
+
     def test_get_field_bibtex(self):
         """
         should emit a warning when calling _get_field with bibtex but otherwise work
@@ -225,6 +303,261 @@ class TestSearchQuery(unittest.TestCase):
                 sq.query['cursorMark'], sq.response.json['nextCursorMark']
             )
 
+    def test_prefetch(self):
+        """
+        a prefetching query should return the same articles, in the same
+        order, as a serial query and should respect max_pages
+        """
+        with MockSolrResponse(SEARCH_URL):
+            serial = [a.bibcode for a in
+                      SearchQuery(q="unittest", rows=2, max_pages=3, start=0)]
+
+            sq = SearchQuery(q="unittest", rows=2, max_pages=3, start=0,
+                             prefetch=2)
+            self.assertEqual([a.bibcode for a in sq], serial)
+            self.assertEqual(len(sq.articles), 6)
+            self.assertEqual(sq.query['start'], 6)
+
+            sq.max_pages = 500
+            self.assertEqual(len(list(sq)), 28-6)
+            self.assertEqual(sq.progress, "28/28")
+            sq.close()
+
+        with six.assertRaisesRegex(self, AssertionError, "prefetch"):
+            SearchQuery(q="unittest", prefetch=-1)
+
+    def test_prefetch_error(self):
+        """
+        next() should restart the prefetcher from the page that failed after
+        a fetch error, rather than wait for a page that never comes
+        """
+        fetch = SearchQuery._fetch
+        calls = []
+
+        def flaky_fetch(sq, query, streaming=False):
+            calls.append(query['start'])
+            if len(calls) == 2:
+                raise APIResponseError("rate limited")
+            return fetch(sq, query, streaming)
+
+        with MockSolrResponse(SEARCH_URL), \
+                patch.object(SearchQuery, "_fetch", flaky_fetch):
+            sq = SearchQuery(q="unittest", rows=2, max_pages=3, start=0,
+                             prefetch=1)
+            next(sq)
+            next(sq)
+            with self.assertRaises(APIResponseError):
+                next(sq)
+            self.assertEqual(len(list(sq)), 4)
+            sq.close()
+        self.assertEqual(calls, [0, 2, 2, 4])
+
+    def test_prefetch_close(self):
+        """
+        a prefetching query should stop its thread when it is closed, used
+        as a context manager, or garbage collected
+        """
+        with MockSolrResponse(SEARCH_URL):
+            with SearchQuery(q="unittest", rows=2, max_pages=5, start=0,
+                             prefetch=2) as sq:
+                next(sq)
+                thread = sq._prefetcher._thread
+            thread.join(2)
+            self.assertFalse(thread.is_alive())
+
+            sq = SearchQuery(q="unittest", rows=2, max_pages=5, start=0,
+                             prefetch=2)
+            next(sq)
+            thread = sq._prefetcher._thread
+            ref = weakref.ref(sq)
+            del sq
+            thread.join(2)
+            gc.collect()
+            self.assertIsNone(ref())
+            self.assertFalse(thread.is_alive())
+
+    def test_stream(self):
+        """
+        a streaming query should only keep the articles that have not been
+        iterated over, while progress keeps counting every fetched article
+        """
+        sq = SearchQuery(q="unittest", rows=5, max_pages=100, start=0,
+                         stream=True)
+        with MockSolrResponse(SEARCH_URL):
+            self.assertEqual(next(sq).bibcode, '1971Sci...174..142S')
+            self.assertEqual(len(sq.articles), 5)
+            bibcodes = [a.bibcode for a in sq]
+        self.assertEqual(len(bibcodes), 27)
+        self.assertEqual(bibcodes[0], '2012GCN..13229...1S')
+        self.assertEqual(bibcodes[-1], '2009ApJ...699...56S')
+        self.assertEqual(sq.progress, "28/28")
+        self.assertLessEqual(len(sq.articles), 5)
+
+    @unittest.skipIf(ijson is None, "ijson is not installed")
+    def test_iter_docs(self):
+        """
+        iter_docs should yield every doc across pages as they are parsed,
+        without keeping them on the responses
+        """
+        sq = SearchQuery(q="unittest", fl=["bibcode", "id"], rows=10,
+                         start=0, max_pages=100)
+        with MockSolrResponse(SEARCH_URL):
+            docs = list(sq.iter_docs())
+        self.assertEqual(docs[0], {"bibcode": "1971Sci...174..142S",
+                                   "id": "9535116"})
+        self.assertEqual(docs[-1]["bibcode"], "2009ApJ...699...56S")
+        self.assertEqual(len(docs), 28)
+        self.assertEqual(sq.progress, "28/28")
+        self.assertEqual(sq.response.docs, [])
+        self.assertEqual(len(sq.articles), 0)
+
+    def test_intern_fields(self):
+        """
+        values of the interned fields should share one string object across
+        pages, and not otherwise
+        """
+        sq = SearchQuery(q="unittest", fl=["pub", "author"], rows=5,
+                         start=0, max_pages=2,
+                         intern_fields=SearchQuery.INTERN_FIELDS)
+        with MockSolrResponse(SEARCH_URL):
+            articles = list(sq)
+        self.assertEqual(articles[1].pub, articles[7].pub)
+        self.assertIs(articles[1].pub, articles[7].pub)
+        self.assertIs(articles[1].author[0], articles[2].author[0])
+
+        sq = SearchQuery(q="unittest", fl=["pub"], rows=5, start=0,
+                         max_pages=2)
+        with MockSolrResponse(SEARCH_URL):
+            articles = list(sq)
+        self.assertIsNot(articles[1].pub, articles[7].pub)
+
+    def test_adaptive_rows(self):
+        """
+        AdaptiveRows should scale rows towards its targets within its limits,
+        and an adaptive query should re-tune rows between pages
+        """
+        ar = AdaptiveRows(target_latency=2.0, target_bytes=1000, min_rows=10,
+                          max_rows=2000)
+        self.assertEqual(ar.next_rows(100, 1.0, 100), 200)
+        self.assertEqual(ar.next_rows(100, 4.0, 100), 50)
+        self.assertEqual(ar.next_rows(100, 1.0, 4000), 25)
+        self.assertEqual(ar.next_rows(100, 100.0, 100), 10)
+        self.assertEqual(ar.next_rows(1500, 0.1, 100), 2000)
+        ar.ceiling = 300
+        self.assertEqual(ar.next_rows(200, 0.1, 100), 300)
+
+        sq = SearchQuery(q="unittest", rows=2, max_pages=100, start=0,
+                         adaptive_rows=AdaptiveRows(target_latency=1e3,
+                                                    min_rows=1))
+        with MockSolrResponse(SEARCH_URL):
+            self.assertEqual(len(list(sq)), 28)
+        self.assertEqual(sq._n_pages, 4)
+        self.assertEqual(sq.query['start'], 30)
+
+        with six.assertRaisesRegex(self, AssertionError, "fixed number"):
+            SearchQuery(q="unittest", start=0,
+                        adaptive_rows=True).execute_parallel()
+
+    def test_count(self):
+        """
+        count() should return numFound without any documents, and
+        count_many() should map facet.query counts back to the input order
+        """
+        sq = SearchQuery(q="unittest", rows=5)
+        with MockSolrResponse(SEARCH_URL):
+            self.assertEqual(sq.count(), 28)
+            self.assertIsNone(sq.response)
+            self.assertEqual(
+                sq.count_many(["year:2013", "year:1971", "year:2012",
+                               "year:2013", "year:1999"]),
+                [11, 1, 12, 11, 0]
+            )
+
+            # every request should stay within max_url_length
+            urls = []
+            request = SearchQuery._request
+
+            def record_request(sq, query, streaming=False):
+                urls.append(requests.Request(
+                    "GET", SEARCH_URL, params=query).prepare().url)
+                return request(sq, query, streaming)
+
+            with patch.object(SearchQuery, "_request", record_request):
+                self.assertEqual(
+                    sq.count_many(["year:{}".format(y)
+                                   for y in range(1900, 2100)] + ["year:2012"],
+                                  max_url_length=500)[-2:],
+                    [0, 12]
+                )
+            self.assertGreater(len(urls), 1)
+            self.assertLessEqual(max(len(url) for url in urls), 500)
+
+    def test_facets(self):
+        """
+        facet params should be sent with the query and the counts parsed
+        into a FacetResult; rows=0 should fetch no articles
+        """
+        sq = SearchQuery(q="unittest", rows=0, facet_field="year",
+                         facet_limit=5)
+        self.assertEqual(sq.query['facet'], 'true')
+        self.assertEqual(sq.query['facet.field'], ['year'])
+        self.assertEqual(sq.query['facet.limit'], 5)
+        with MockSolrResponse(SEARCH_URL):
+            self.assertEqual(sq.facets.fields['year'][:2],
+                             [('2012', 12), ('2013', 11)])
+            self.assertEqual(list(sq), [])
+        self.assertEqual(sq.progress, "0/28")
+
+        sq = SearchQuery(q="unittest")
+        self.assertNotIn('facet', sq.query)
+        with MockSolrResponse(SEARCH_URL):
+            self.assertIsNone(sq.facets)
+
+    def test_stats(self):
+        """
+        stats params should be sent with the query and the stats component
+        parsed into a StatsResult
+        """
+        sq = SearchQuery(q="unittest", rows=0,
+                         stats_field=["citation_count", "read_count"])
+        with MockSolrResponse(SEARCH_URL):
+            self.assertEqual(sq.stats["citation_count"].sum, 48)
+            self.assertEqual(sq.stats["citation_count"].max, 30)
+            self.assertEqual(sq.stats["read_count"].sum, 17.0)
+            self.assertEqual(sq.count(), 28)
+
+    def test_execute_parallel(self):
+        """
+        execute_parallel() should fetch the remaining pages of a start based
+        query concurrently and keep .articles in the serial order
+        """
+        with MockSolrResponse(SEARCH_URL):
+            serial = [a.bibcode for a in
+                      SearchQuery(q="unittest", rows=3, max_pages=4, start=0)]
+
+            sq = SearchQuery(q="unittest", rows=3, max_pages=4, start=0)
+            sq.execute_parallel(max_workers=3)
+            self.assertEqual([a.bibcode for a in sq.articles], serial)
+            self.assertEqual(sq.query['start'], 12)
+
+            sq.max_pages = 100
+            sq.execute_parallel()
+            self.assertEqual(len(sq.articles), 28)
+            self.assertEqual(len(list(sq)), 28)
+
+            # the rows ceiling is applied before the offsets are planned
+            sq = SearchQuery(q="unittest", rows=10e6, max_pages=10, start=0)
+            with warnings.catch_warnings(record=True) as w:
+                warnings.simplefilter("always")
+                sq.execute_parallel()
+            self.assertEqual(sq.query['rows'], 300)
+            self.assertEqual(
+                len([x for x in w if issubclass(x.category, UserWarning)]), 1)
+            self.assertEqual(len(sq.articles), 28)
+
+        with six.assertRaisesRegex(self, AssertionError, "start based"):
+            SearchQuery(q="unittest").execute_parallel()
+
     def test_init(self):
         """
         init should result in a properly formatted query attribute
@@ -332,6 +665,85 @@ class TestSearchQuery(unittest.TestCase):
             )
 
 
+class TestShardedSearchQuery(unittest.TestCase):
+    """
+    Tests for ShardedSearchQuery
+    """
+
+    def test_shard_helpers(self):
+        """
+        range_shards() and prefix_shards() should build disjoint fq slices
+        """
+        self.assertEqual(
+            range_shards("year", [2000, 2005, 2010]),
+            ["year:[2000 TO 2005}", "year:[2005 TO 2010]"]
+        )
+        self.assertEqual(
+            prefix_shards("bibcode", ["1990", "1991"]),
+            ["bibcode:1990*", "bibcode:1991*"]
+        )
+
+    def test_sharded_init(self):
+        """
+        each shard should be a SearchQuery with the shard added to the base
+        fq and the sort fields added to fl
+        """
+        sq = ShardedSearchQuery(
+            ["year:1990", "year:1991"], q="star", fq="database:astronomy",
+            sort="citation_count", fl=["bibcode"]
+        )
+        self.assertEqual(len(sq.shards), 2)
+        self.assertEqual(sq.shards[1].query['fq'],
+                         ["database:astronomy", "year:1991"])
+        self.assertEqual(sq.shards[0].query['sort'],
+                         "citation_count desc,id desc")
+        self.assertEqual(sq.shards[0].query['cursorMark'], "*")
+        self.assertEqual(sq.shards[0].query['fl'],
+                         ["id", "bibcode", "citation_count"])
+        self.assertEqual(sq.query['fl'], ["id", "bibcode"])
+
+        sq = ShardedSearchQuery(["year:1990"], q="star", start=0)
+        self.assertEqual(sq.shards[0].query['start'], 0)
+        self.assertNotIn('cursorMark', sq.shards[0].query)
+
+        with self.assertRaises(TypeError):
+            ShardedSearchQuery(["year:1990"], q="star", checkpoint="x.json")
+
+    def test_merge(self):
+        """
+        the shards' results should be k-way merged into the sort order
+        """
+        sq = ShardedSearchQuery(["a", "b", "c"], q="star",
+                                sort="citation_count desc,bibcode asc")
+        sq.shards = [
+            [Article(bibcode="A", citation_count=9),
+             Article(bibcode="B", citation_count=3)],
+            [Article(bibcode="C", citation_count=5),
+             Article(bibcode="D", citation_count=3),
+             Article(bibcode="E", citation_count=None)],
+            [],
+        ]
+        sq._merged = sq._merge()
+        self.assertEqual([a.bibcode for a in sq], ["A", "C", "B", "D", "E"])
+        self.assertEqual(len(sq.articles), 5)
+        # kept as one page, not one page per article
+        self.assertEqual(len(sq.articles._pages), 1)
+        self.assertEqual([a.bibcode for a in sq.articles[1:3]], ["C", "B"])
+
+    def test_iter(self):
+        """
+        iterating should run every shard against the API
+        """
+        sq = ShardedSearchQuery(range_shards("year", [1970, 2000, 2020]),
+                                q="unittest", rows=2, max_pages=2)
+        with MockSolrResponse(SEARCH_URL):
+            articles = list(sq)
+        sq.close()
+        # the mock server ignores fq and cursorMark, so every page is the same
+        self.assertEqual(len(articles), 8)
+        self.assertEqual(sq.progress, "8/56")
+
+
 class TestSolrResponse(unittest.TestCase):
     """
     Test the SolrResponse object
@@ -393,6 +805,75 @@ class TestSolrResponse(unittest.TestCase):
         with self.assertRaises(APIResponseError):
             SolrResponse.load_http_response(self.response)
 
+    def test_keep_raw(self):
+        """
+        the raw text of the response should be discarded after parsing
+        unless ads.config.keep_raw is set
+        """
+        sr = SolrResponse.load_http_response(self.response)
+        self.assertEqual(sr._raw, self.response.text)
+        ads.config.keep_raw = False
+        try:
+            with MockSolrResponse('http://solr-response.unittest'):
+                response = requests.get('http://solr-response.unittest')
+            sr = SolrResponse.load_http_response(response)
+        finally:
+            ads.config.keep_raw = True
+        self.assertIsNone(sr._raw)
+        self.assertIsNone(sr.response.content)
+        self.assertEqual(sr.numFound, 28)
+        self.assertEqual(len(sr.articles), 28)
+
+    def test_lazy_articles(self):
+        """
+        articles should only be built when they are accessed, and the docs
+        should not be changed to fill in missing fields
+        """
+        sr = SolrResponse(self.response)
+        sr.fl = ['id', 'doi', 'bibcode', 'bibstem']
+        self.assertEqual(len(sr.articles), 28)
+        self.assertEqual(sr.articles._n_built, 0)
+        self.assertIsNone(sr.articles[3].bibstem)
+        self.assertEqual(sr.articles[-1].bibcode, '2009ApJ...699...56S')
+        self.assertEqual(sr.articles._n_built, 2)
+        self.assertNotIn('bibstem', sr.docs[3])
+
+        sq = SearchQuery(q="unittest", rows=10)
+        with MockSolrResponse(SEARCH_URL):
+            next(sq)
+        self.assertEqual(len(sq.articles), 10)
+        self.assertEqual(sq.response.articles._n_built, 1)
+
+    def test_articles_list_operations(self):
+        """
+        the articles sequences should support the list operations that
+        callers of the former lists rely on
+        """
+        sr = SolrResponse(self.response)
+        bibcodes = [a.bibcode for a in sr.articles]
+        self.assertEqual(sr.articles, list(sr.articles))
+        self.assertEqual(len(sr.articles + sr.articles[:2]), 30)
+        self.assertEqual(len(sr.articles[:2] + sr.articles), 30)
+        self.assertIsInstance(sr.articles.copy(), list)
+        self.assertEqual(sr.articles.index(sr.articles[5]), 5)
+        self.assertEqual(sr.articles.count(sr.articles[5]), 1)
+        self.assertEqual(json.dumps([a.bibcode for a in sr.articles]),
+                         json.dumps(bibcodes))
+
+        sr.articles.sort(key=lambda a: a.bibcode, reverse=True)
+        self.assertEqual([a.bibcode for a in sr.articles],
+                         sorted(bibcodes, reverse=True))
+
+        sq = SearchQuery(q="unittest", rows=10, max_pages=2, start=0,
+                         fl=["bibcode"])
+        with MockSolrResponse(SEARCH_URL):
+            list(sq)
+        sq.articles.sort(key=lambda a: a.bibcode)
+        self.assertEqual([a.bibcode for a in sq.articles],
+                         sorted(bibcodes[:20]))
+        self.assertEqual(len(sq.articles + []), 20)
+        self.assertEqual(sq.articles[-1].bibcode, sorted(bibcodes[:20])[-1])
+
     @patch('ads.search.Article._get_field')
     def test_default_article_fields(self, patched):
         """
@@ -0,0 +1,70 @@
+"""
+Tests for pickling and encoding search results
+"""
+import pickle
+import unittest
+
+from .mocks import MockSolrResponse
+
+from ads.search import SearchQuery, SolrResponse
+from ads.serialization import dumps_articles, loads_articles, msgpack
+from ads.config import SEARCH_URL
+
+
+class TestSerialization(unittest.TestCase):
+    """
+    Test pickling of Articles and SolrResponses, and the msgpack encoding
+    of lists of Articles
+    """
+
+    def setUp(self):
+        self.sq = SearchQuery(q="unittest", rows=5, start=0,
+                              fl=["id", "bibcode", "year"])
+        with MockSolrResponse(SEARCH_URL):
+            self.articles = list(self.sq)
+
+    def test_pickle_article(self):
+        """
+        an unpickled article should have the same field data, share its
+        layout with the other articles of the same pickle, and still load
+        missing fields on access
+        """
+        articles = pickle.loads(pickle.dumps(self.articles))
+        self.assertEqual([dict(a._raw) for a in articles],
+                         [dict(a._raw) for a in self.articles])
+        self.assertIs(articles[0]._raw._layout, articles[4]._raw._layout)
+        self.assertIsNone(articles[0]._cache)
+        self.assertNotIn("pub", articles[0]._raw)
+        with MockSolrResponse(SEARCH_URL):
+            self.assertEqual(articles[0].pub, "Science")
+
+    def test_pickle_solr_response(self):
+        """
+        an unpickled SolrResponse should be rebuilt from its json alone
+        """
+        response = pickle.loads(pickle.dumps(self.sq.response))
+        self.assertIsInstance(response, SolrResponse)
+        self.assertIsNone(response._raw)
+        self.assertEqual(response.json, self.sq.response.json)
+        self.assertEqual(response.numFound, 28)
+        self.assertEqual(response.articles[2].bibcode,
+                         self.articles[2].bibcode)
+
+    @unittest.skipIf(msgpack is None, "msgpack is not installed")
+    def test_dumps_loads_articles(self):
+        """
+        encoded articles should decode to the same field data, keeping
+        absent fields absent, and load missing fields for all at once
+        """
+        del self.articles[3]._raw["year"]
+        self.articles[4].bibstem = "ApJ"
+        data = dumps_articles(self.articles)
+        self.assertLess(len(data), len(pickle.dumps(self.articles)))
+
+        articles = loads_articles(data)
+        self.assertEqual([dict(a._raw) for a in articles],
+                         [dict(a._raw) for a in self.articles])
+        self.assertNotIn("year", articles[3]._raw)
+        with MockSolrResponse(SEARCH_URL):
+            self.assertEqual(articles[0].pub, "Science")
+        self.assertEqual(articles[4]._raw["pub"], "GRB Coordinates Network")
@@ -0,0 +1,60 @@
+"""
+Tests for the stats component
+"""
+import unittest
+
+from ads.stats import StatsResult, FieldStats, stats_params
+
+
+class TestStatsParams(unittest.TestCase):
+    """
+    Test stats_params()
+    """
+
+    def test_params(self):
+        """
+        stats fields should be sent as stats.field, with local params for
+        percentiles that keep the default statistics
+        """
+        self.assertEqual(stats_params(), {})
+        self.assertEqual(
+            stats_params("citation_count"),
+            {"stats": "true", "stats.field": ["citation_count"]}
+        )
+        params = stats_params(["citation_count", "read_count"],
+                              percentiles=[50, 90])
+        self.assertEqual(len(params["stats.field"]), 2)
+        self.assertTrue(params["stats.field"][1].endswith("}read_count"))
+        self.assertIn("percentiles='50,90'", params["stats.field"][0])
+        self.assertIn("sum=true", params["stats.field"][0])
+
+
+class TestStatsResult(unittest.TestCase):
+    """
+    Test StatsResult parsing
+    """
+
+    def test_init(self):
+        """
+        each stats field should be parsed into a FieldStats
+        """
+        sr = StatsResult({"stats_fields": {
+            "citation_count": {
+                "min": 0.0, "max": 30.0, "sum": 48.0, "count": 28,
+                "missing": 0, "mean": 1.71, "stddev": 6.1,
+                "percentiles": ["50.0", 0.0, "90.0", 1.0]
+            },
+            "read_count": {"sum": 17.0, "percentiles": {"50.0": 0.0}},
+            "empty_field": None,
+        }})
+        cc = sr["citation_count"]
+        self.assertIsInstance(cc, FieldStats)
+        self.assertEqual((cc.min, cc.max, cc.sum, cc.count),
+                         (0.0, 30.0, 48.0, 28))
+        self.assertEqual(cc.percentiles, {50.0: 0.0, 90.0: 1.0})
+        self.assertEqual(sr["read_count"].percentiles, {50.0: 0.0})
+        self.assertIsNone(sr["empty_field"].sum)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
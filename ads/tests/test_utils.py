@@ -4,7 +4,7 @@ Tests for utility functions
 import warnings
 import unittest
 
-from ads.utils import cached_property
+from ads.utils import cached_property, cached_field
 
 
 class TestUtils(unittest.TestCase):
@@ -43,5 +43,35 @@ class TestUtils(unittest.TestCase):
             dc.lazy_attribute
             self.assertEqual(len(w), 0)
 
+    def test_cached_field(self):
+        """
+        cached_field should cache in the instance's storage mapping and warn
+        once, like cached_property
+        """
+        class DummyClass(object):
+            __slots__ = ("_raw",)
+
+            def __init__(self):
+                self._raw = {}
+
+            @cached_field
+            def lazy_attribute(self):
+                return 42
+
+        dc = DummyClass()
+        with warnings.catch_warnings(record=True) as w:
+            self.assertEqual(dc.lazy_attribute, 42)
+            self.assertEqual(dc.lazy_attribute, 42)
+            self.assertEqual(len(w), 1)
+        self.assertEqual(dc._raw, {"lazy_attribute": 42})
+
+        # no warning if attr is explicitly set
+        dc = DummyClass()
+        with warnings.catch_warnings(record=True) as w:
+            dc.lazy_attribute = 'foo'
+            self.assertEqual(dc.lazy_attribute, 'foo')
+            self.assertEqual(len(w), 0)
+
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
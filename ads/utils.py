@@ -32,4 +32,60 @@ class cached_property(_cached_property):
             )
             value = self.fget(obj)
             obj.__dict__[self.__name__] = value
-        return value
\ No newline at end of file
+        return value
+
+
+class cached_field(object):
+    """
+    A cached property for objects without a __dict__, e.g. those that define
+    __slots__. The value is cached in the mapping held by the instance
+    attribute named by `storage`, which is created on first use if it is
+    None. Prints the same lazy loading warning as cached_property.
+    """
+    storage = "_raw"
+
+    def __init__(self, func, name=None, doc=None, storage=None):
+        self.__name__ = name or func.__name__
+        self.__module__ = func.__module__
+        self.__doc__ = doc or func.__doc__
+        self.fget = func
+        if storage is not None:
+            self.storage = storage
+
+    def _store(self, obj):
+        store = getattr(obj, self.storage)
+        if store is None:
+            store = {}
+            setattr(obj, self.storage, store)
+        return store
+
+    def __get__(self, obj, type=None):
+        if obj is None:
+            return self
+        store = self._store(obj)
+        value = store.get(self.__name__, _missing)
+        if value is _missing:
+            warnings.warn(
+                "You are lazy loading attributes via '{}', and so are "
+                "making multiple calls to the API. This will impact your overall "
+                "rate limits."
+                .format(self.__name__),
+                UserWarning,
+            )
+            value = self.fget(obj)
+            store[self.__name__] = value
+        return value
+
+    def __set__(self, obj, value):
+        self._store(obj)[self.__name__] = value
+
+    def __delete__(self, obj):
+        self._store(obj).pop(self.__name__, None)
+
+
+def cached_computed_field(func):
+    """
+    cached_field for values that are not part of the record itself, which
+    are cached in the instance's `_cache` mapping instead of `_raw`
+    """
+    return cached_field(func, storage="_cache")
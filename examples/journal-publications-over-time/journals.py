@@ -63,8 +63,16 @@ if __name__ == "__main__":
         "Space Science Reviews",
         ]
 
+    # We don't want any of the articles, just how many there were, so we count
+    # every journal and year with facet queries: a handful of requests in total
+    year_range = range(years[0], years[1] + 1)
+    counts = ads.SearchQuery(q="*:*").count_many([
+        "pub:\"{journal}\" year:{year}".format(journal=journal, year=year)
+        for journal in journals for year in year_range
+    ])
+
     publication_data = []
-    for journal in journals:
+    for i, journal in enumerate(journals):
 
         # Initiate the dictionary for this journal
         journal_data = {
@@ -73,15 +81,9 @@ if __name__ == "__main__":
             "total": 0
         }
 
-        for year in range(years[0], years[1] + 1):
-            
-            # Perform the query
-            # We actually don't want all the results, we just want the metadata
-            # which tells us how many publications there were
-            q = ads.SearchQuery(q="pub:\"{journal}\" year:{year}".format(journal=journal, year=year), fl=['id'], rows=1)
-            q.execute()
+        for j, year in enumerate(year_range):
 
-            num = int(q.response.numFound)
+            num = counts[i * len(year_range) + j]
             print("{journal} had {num} publications in {year}"
                   .format(journal=journal, num=num, year=year))
 
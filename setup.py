@@ -46,6 +46,22 @@ setup(name="ads",
       extras_require={
           "tests": [
             "httpretty>=0.8.10",
-          ]
+          ],
+          "ijson": [
+            "ijson>=3.1",
+          ],
+          "msgpack": [
+            "msgpack",
+          ],
+          "numpy": [
+            "numpy",
+          ],
+          "arrow": [
+            "pyarrow",
+          ],
+          "pandas": [
+            "pyarrow",
+            "pandas",
+          ],
       }
      )